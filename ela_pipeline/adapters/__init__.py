@@ -1,5 +1,5 @@
 """Compatibility adapters for legacy data formats."""
 
-from .legacy_contract import adapt_legacy_contract_doc
+from .legacy_contract import adapt_legacy_contract_bytes, adapt_legacy_contract_doc
 
-__all__ = ["adapt_legacy_contract_doc"]
+__all__ = ["adapt_legacy_contract_bytes", "adapt_legacy_contract_doc"]
@@ -2,15 +2,23 @@
 
 from __future__ import annotations
 
+import json
 from copy import deepcopy
 from typing import Any
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib json fallback
+    orjson = None
+
 
 _NULLABLE_TAM_FIELDS = ("tense", "aspect", "mood", "voice", "finiteness")
 
 
-def _adapt_node(node: dict[str, Any]) -> dict[str, Any]:
-    out = deepcopy(node)
+def _adapt_fields(node: dict[str, Any]) -> dict[str, Any]:
+    # Copy every field except the children, which _adapt_node rebuilds itself, so the
+    # adapted tree never shares containers (notes, features, spans) with the input.
+    out = {key: value if key == "linguistic_elements" else deepcopy(value) for key, value in node.items()}
 
     for field in _NULLABLE_TAM_FIELDS:
         if out.get(field) == "null":
@@ -37,14 +45,7 @@ def _adapt_node(node: dict[str, Any]) -> dict[str, Any]:
         elif node_type == "Word" and isinstance(out.get("word_cefr"), str):
             out["cefr_level"] = out["word_cefr"]
 
-    if "linguistic_elements" not in out or not isinstance(out.get("linguistic_elements"), list):
-        out["linguistic_elements"] = []
-
-    children = []
-    for child in out.get("linguistic_elements", []):
-        if isinstance(child, dict):
-            children.append(_adapt_node(child))
-    out["linguistic_elements"] = children
+    out["linguistic_elements"] = []
 
     if "schema_version" not in out:
         out["schema_version"] = "v2"
@@ -52,6 +53,23 @@ def _adapt_node(node: dict[str, Any]) -> dict[str, Any]:
     return out
 
 
+def _adapt_node(node: dict[str, Any]) -> dict[str, Any]:
+    root = _adapt_fields(node)
+    stack = [(node, root)]
+    while stack:
+        source, adapted = stack.pop()
+        raw_children = source.get("linguistic_elements")
+        if not isinstance(raw_children, list):
+            continue
+        children = adapted["linguistic_elements"]
+        for child in raw_children:
+            if isinstance(child, dict):
+                adapted_child = _adapt_fields(child)
+                children.append(adapted_child)
+                stack.append((child, adapted_child))
+    return root
+
+
 def adapt_legacy_contract_doc(doc: dict[str, Any]) -> dict[str, Any]:
     """Convert legacy sentence payload map into unified contract-compatible map."""
     out: dict[str, Any] = {}
@@ -60,3 +78,14 @@ def adapt_legacy_contract_doc(doc: dict[str, Any]) -> dict[str, Any]:
             continue
         out[str(sentence_text)] = _adapt_node(sentence_node)
     return out
+
+
+def adapt_legacy_contract_bytes(payload: bytes | str) -> dict[str, Any]:
+    """Parse a raw legacy JSON payload once (orjson when available) and adapt it."""
+    if orjson is not None:
+        doc = orjson.loads(payload)
+    else:
+        doc = json.loads(payload)
+    if not isinstance(doc, dict):
+        return {}
+    return adapt_legacy_contract_doc(doc)
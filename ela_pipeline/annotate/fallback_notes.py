@@ -2,13 +2,19 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Dict
 
 
+@lru_cache(maxsize=4096)
+def _token_count(content: str) -> int:
+    return len(content.split())
+
+
 def _sentence_note(node: Dict) -> str:
     tense = (node.get("tense") or "null").strip().lower()
     content = (node.get("content") or "").strip()
-    token_count = len(content.split()) if content else 0
+    token_count = _token_count(content) if content else 0
 
     if tense and tense != "null":
         return (
@@ -53,65 +59,73 @@ def _phrase_note(node: Dict) -> str:
     )
 
 
+_ARTICLE_TEMPLATES = {
+    "the": "'{content}' is the definite article, signaling a specific or identifiable noun reference.",
+    "a": "'{content}' is an indefinite article, introducing a nonspecific countable noun reference.",
+    "an": "'{content}' is an indefinite article, introducing a nonspecific countable noun reference.",
+}
+
+_VERB_TENSE_TEMPLATES = {
+    "past": "'{content}' is a past-form verb that presents the event as completed in prior time.",
+    "present": "'{content}' is a present-form verb expressing an action or state in current relevance.",
+    "past participle": "'{content}' is a past participle that often contributes perfect or passive verbal constructions.",
+    "present participle": "'{content}' is a present participle that can mark progressive aspect or modifier function.",
+    "participle": "'{content}' is a participial verb form contributing non-finite verbal meaning.",
+}
+
+_PREP_TEMPLATES = {
+    "in": "'{content}' is a preposition marking containment or location within a bounded context.",
+    "on": "'{content}' is a preposition marking surface contact or supported spatial relation.",
+    "at": "'{content}' is a preposition marking a point-like location or temporal anchor.",
+    "to": "'{content}' is a preposition marking direction, goal, or recipient relation.",
+    "from": "'{content}' is a preposition marking source, origin, or starting point relation.",
+    "with": "'{content}' is a preposition marking accompaniment, instrument, or associative relation.",
+    "by": "'{content}' is a preposition marking agency, means, or proximity relation.",
+    "of": "'{content}' is a preposition marking dependency, composition, or possessive relation.",
+}
+
+_WORD_TEMPLATES = {
+    "article": "'{content}' is an article used to specify or determine a related noun.",
+    "noun": "'{content}' is a noun that names an entity, concept, or object in context.",
+    "proper noun": "'{content}' is a proper noun referring to a specific named entity.",
+    "pronoun": "'{content}' is a pronoun used to refer to an entity without repeating a full noun phrase.",
+    "verb": "'{content}' is a verb form that contributes core action or state meaning.",
+    "auxiliary verb": "'{content}' is an auxiliary verb that supports verbal grammar, modality, or voice interpretation.",
+    "adjective": "'{content}' is an adjective that modifies a noun by adding descriptive information.",
+    "adverb": "'{content}' is an adverb that modifies a verb, adjective, or clause-level meaning.",
+    "preposition": "'{content}' is a preposition that links a noun phrase to another sentence element.",
+    "coordinating conjunction": "'{content}' is a coordinating conjunction that joins parallel elements.",
+    "subordinating conjunction": "'{content}' is a subordinating conjunction introducing a dependent clause.",
+    "particle": "'{content}' functions as a particle that refines a verb or clause meaning.",
+    "numeral": "'{content}' is a numeral expressing quantity or order.",
+    "interjection": "'{content}' is an interjection expressing immediate attitude or reaction.",
+    "punctuation": "'{content}' is punctuation marking structure, boundaries, or discourse rhythm.",
+}
+
+_DEFAULT_WORD_TEMPLATE = "'{content}' is a lexical item contributing grammatical and semantic information in context."
+
+# Specific templates keyed by part of speech; each handler picks its lookup key from (content_l, tense).
+_WORD_DISPATCH = {
+    "article": (_ARTICLE_TEMPLATES, lambda content_l, tense: content_l),
+    "verb": (_VERB_TENSE_TEMPLATES, lambda content_l, tense: tense),
+    "preposition": (_PREP_TEMPLATES, lambda content_l, tense: content_l),
+}
+
+
 def _word_note(node: Dict) -> str:
     content = node.get("content", "This word")
     content_l = content.lower()
     pos = (node.get("part_of_speech") or "word").strip().lower()
     tense = (node.get("tense") or "null").strip().lower()
 
-    if pos == "article":
-        if content_l == "the":
-            return f"'{content}' is the definite article, signaling a specific or identifiable noun reference."
-        if content_l in {"a", "an"}:
-            return f"'{content}' is an indefinite article, introducing a nonspecific countable noun reference."
-
-    if pos == "verb":
-        if tense == "past":
-            return f"'{content}' is a past-form verb that presents the event as completed in prior time."
-        if tense == "present":
-            return f"'{content}' is a present-form verb expressing an action or state in current relevance."
-        if tense == "past participle":
-            return f"'{content}' is a past participle that often contributes perfect or passive verbal constructions."
-        if tense == "present participle":
-            return f"'{content}' is a present participle that can mark progressive aspect or modifier function."
-        if tense == "participle":
-            return f"'{content}' is a participial verb form contributing non-finite verbal meaning."
-
-    if pos == "preposition":
-        prep_templates = {
-            "in": f"'{content}' is a preposition marking containment or location within a bounded context.",
-            "on": f"'{content}' is a preposition marking surface contact or supported spatial relation.",
-            "at": f"'{content}' is a preposition marking a point-like location or temporal anchor.",
-            "to": f"'{content}' is a preposition marking direction, goal, or recipient relation.",
-            "from": f"'{content}' is a preposition marking source, origin, or starting point relation.",
-            "with": f"'{content}' is a preposition marking accompaniment, instrument, or associative relation.",
-            "by": f"'{content}' is a preposition marking agency, means, or proximity relation.",
-            "of": f"'{content}' is a preposition marking dependency, composition, or possessive relation.",
-        }
-        if content_l in prep_templates:
-            return prep_templates[content_l]
-
-    templates = {
-        "article": f"'{content}' is an article used to specify or determine a related noun.",
-        "noun": f"'{content}' is a noun that names an entity, concept, or object in context.",
-        "proper noun": f"'{content}' is a proper noun referring to a specific named entity.",
-        "pronoun": f"'{content}' is a pronoun used to refer to an entity without repeating a full noun phrase.",
-        "verb": f"'{content}' is a verb form that contributes core action or state meaning.",
-        "auxiliary verb": f"'{content}' is an auxiliary verb that supports verbal grammar, modality, or voice interpretation.",
-        "adjective": f"'{content}' is an adjective that modifies a noun by adding descriptive information.",
-        "adverb": f"'{content}' is an adverb that modifies a verb, adjective, or clause-level meaning.",
-        "preposition": f"'{content}' is a preposition that links a noun phrase to another sentence element.",
-        "coordinating conjunction": f"'{content}' is a coordinating conjunction that joins parallel elements.",
-        "subordinating conjunction": f"'{content}' is a subordinating conjunction introducing a dependent clause.",
-        "particle": f"'{content}' functions as a particle that refines a verb or clause meaning.",
-        "numeral": f"'{content}' is a numeral expressing quantity or order.",
-        "interjection": f"'{content}' is an interjection expressing immediate attitude or reaction.",
-        "punctuation": f"'{content}' is punctuation marking structure, boundaries, or discourse rhythm.",
-    }
-
-    if pos in templates:
-        return templates[pos]
-    return f"'{content}' is a lexical item contributing grammatical and semantic information in context."
+    handler = _WORD_DISPATCH.get(pos)
+    if handler is not None:
+        specific_templates, key_for = handler
+        template = specific_templates.get(key_for(content_l, tense))
+        if template is not None:
+            return template.format(content=content)
+
+    return _WORD_TEMPLATES.get(pos, _DEFAULT_WORD_TEMPLATE).format(content=content)
 
 
 def build_fallback_note(node: Dict) -> str:
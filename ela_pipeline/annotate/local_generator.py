@@ -4,12 +4,18 @@ from __future__ import annotations
 
 import os
 import re
-from typing import Dict, List, Set
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Set
 
 import torch
-from transformers import T5ForConditionalGeneration, T5Tokenizer
+from transformers import T5ForConditionalGeneration, T5Tokenizer, T5TokenizerFast
+from transformers.modeling_outputs import BaseModelOutput
 
 from ela_pipeline.annotate.fallback_notes import build_fallback_note
+from ela_pipeline.annotate.template_annotator import TemplateOnlyAnnotator
 from ela_pipeline.annotate.template_registry import (
     all_template_ids,
     is_template_semantically_compatible,
@@ -19,14 +25,31 @@ from ela_pipeline.annotate.template_registry import (
 from ela_pipeline.annotate.rejected_candidates import (
     DEFAULT_REJECTED_CANDIDATE_FILTER_CONFIG,
     RejectedCandidateFilterConfig,
-    fails_semantic_sanity,
     normalize_and_aggregate_rejected_candidates,
 )
-from ela_pipeline.validation.notes_quality import is_valid_note, sanitize_note
 
+_TEMPLATE_TOKEN_RE = re.compile(r"[A-Z_]{4,}")
 
-class LocalT5Annotator:
-    _TAM_RELEVANT_POS = {"sentence", "verb phrase", "verb", "auxiliary verb"}
+# Fixed instructions that open every prompt; node fields follow as "Label: value" pairs.
+_NOTE_PROMPT_PREFIX = (
+    "Write one short educational linguistic note in natural English. "
+    "Do not output field names, labels, placeholders, booleans, or JSON fragments. "
+)
+_TEMPLATE_ID_PROMPT_PREFIX = (
+    "Predict exactly one template_id for this linguistic node. "
+    "Output only the template_id token and nothing else. "
+)
+# Sampling temperatures for the retry candidates drawn after a rejected greedy output.
+_NOTE_RETRY_TEMPERATURE = 0.9
+_TEMPLATE_RETRY_TEMPERATURE = 0.8
+# Padded input lengths used with compile_model=True so compiled graphs are reused across calls.
+_INPUT_LENGTH_BUCKETS = (64, 128, 256, 512)
+
+
+class LocalT5Annotator(TemplateOnlyAnnotator):
+    # Loaded tokenizers/models are shared by every annotator pointing at the same model directory.
+    _TOKENIZER_CACHE: Dict[str, T5TokenizerFast | T5Tokenizer] = {}
+    _MODEL_CACHE: Dict[tuple[str, str, torch.dtype, bool], object] = {}
 
     def __init__(
         self,
@@ -36,22 +59,54 @@ class LocalT5Annotator:
         max_input_length: int = 512,
         max_target_length: int = 128,
         max_retries: int = 2,
+        batch_size: int = 16,
+        generation_cache_size: int = 4096,
+        use_bf16: bool = True,
+        num_workers: int = 1,
+        backend: str = "torch",
+        compile_model: bool = False,
         rejection_filter_config: RejectedCandidateFilterConfig = DEFAULT_REJECTED_CANDIDATE_FILTER_CONFIG,
     ):
-        self.note_mode = (note_mode or "template_only").strip().lower()
-        if self.note_mode not in {"template_only", "llm", "hybrid", "two_stage"}:
+        note_mode = (note_mode or "template_only").strip().lower()
+        if note_mode not in {"template_only", "llm", "hybrid", "two_stage"}:
             raise ValueError("note_mode must be one of: template_only | llm | hybrid | two_stage")
-
+        self.backend = (backend or "torch").strip().lower()
+        if self.backend not in {"torch", "onnxrt"}:
+            raise ValueError("backend must be one of: torch | onnxrt")
+
+        # Sentences are independent, so they can be annotated on a thread pool; torch releases
+        # the GIL inside generate(). Sampled retries draw from the shared RNG, so only
+        # num_workers=1 keeps their outputs reproducible run to run.
+        super().__init__(backoff_debug_summary=backoff_debug_summary, num_workers=num_workers)
+        self.note_mode = note_mode
         self.device = None
-        self.backoff_debug_summary = bool(backoff_debug_summary)
         self.max_input_length = max_input_length
         self.max_target_length = max_target_length
         self.max_retries = max_retries
+        self.batch_size = max(1, int(batch_size))
         self.rejection_filter_config = rejection_filter_config
+        self.generation_cache_size = max(0, int(generation_cache_size))
+        # Greedy decoding is deterministic per prompt, so its outputs are reused across
+        # nodes and annotate() calls. Sampled retries are never cached.
+        self._greedy_cache: OrderedDict[str, str] = OrderedDict()
+        self._greedy_cache_lock = threading.Lock()
+        # Fast tokenizers are not safe to call from several threads at once; the prefetch pass
+        # tokenizes the next batch on a helper thread while the current one is decoded.
+        self._tokenizer_lock = threading.Lock()
+        # Greedy outputs decoded by the current annotate() call's prefetch pass, keyed by prompt.
+        # Read before the LRU, so evictions (or generation_cache_size=0) never force a re-decode.
+        self._prefetched_outputs: Dict[str, str] = {}
+        # Sampled retries precomputed in batches for the current annotate() call, keyed by
+        # prompt; each entry is consumed by the first node that asks for it.
+        self._planned_samples: Dict[str, List[str]] = {}
+        self._bf16_autocast = False
+        self.compile_model = False
 
         self.tokenizer = None
         self.model = None
-        self._template_ids = set(all_template_ids())
+        self._template_ids = frozenset(all_template_ids())
+        # Decoder length cap for template-id prompts, computed from the tokenizer on first use.
+        self._template_id_length: int | None = None
         if self.note_mode in {"llm", "hybrid", "two_stage"}:
             if not os.path.isdir(model_dir):
                 raise FileNotFoundError(
@@ -64,14 +119,75 @@ class LocalT5Annotator:
                     "Run inference on a machine/session with visible NVIDIA GPU and CUDA-enabled PyTorch."
                 )
             self.device = torch.device("cuda")
-            self.tokenizer = T5Tokenizer.from_pretrained(model_dir)
-            self.model = T5ForConditionalGeneration.from_pretrained(model_dir).to(self.device)
-            self.model.eval()
+            # BF16 halves weight/activation traffic on GPUs that support it. FP16 is not used as
+            # a fallback because T5 activations overflow in half precision.
+            # The ONNX Runtime graph runs in its exported precision.
+            self._bf16_autocast = self.backend == "torch" and bool(use_bf16) and torch.cuda.is_bf16_supported()
+            dtype = torch.bfloat16 if self._bf16_autocast else torch.float32
+            self.compile_model = self.backend == "torch" and bool(compile_model)
+            cache_key = os.path.realpath(model_dir)
+            model_key = (cache_key, self.backend, dtype, self.compile_model)
+            if cache_key not in self._TOKENIZER_CACHE:
+                self._TOKENIZER_CACHE[cache_key] = self._load_tokenizer(model_dir)
+            if model_key not in self._MODEL_CACHE:
+                if self.backend == "onnxrt":
+                    model = self._load_onnxrt_model(model_dir)
+                else:
+                    model = self._load_torch_model(model_dir, dtype).to(self.device)
+                    model.eval()
+                    # generate() reads use_cache from the config when a caller does not pass it.
+                    model.config.use_cache = True
+                    if self.compile_model:
+                        # The decoder steps are compiled by generate() itself once it runs with a
+                        # static KV cache (see _generation_kwargs); the encoder, which we call
+                        # directly, is compiled here. Inputs are padded to fixed length buckets.
+                        encoder = model.get_encoder()
+                        encoder.forward = torch.compile(encoder.forward, mode="reduce-overhead", fullgraph=False)
+                self._MODEL_CACHE[model_key] = model
+            self.tokenizer = self._TOKENIZER_CACHE[cache_key]
+            self.model = self._MODEL_CACHE[model_key]
+
+    @staticmethod
+    def _load_torch_model(model_dir: str, dtype: torch.dtype) -> T5ForConditionalGeneration:
+        # Fused scaled-dot-product attention (the relative position bias is passed as the additive
+        # mask); transformers releases whose T5 has no SDPA path reject it, so fall back to eager.
+        try:
+            return T5ForConditionalGeneration.from_pretrained(model_dir, dtype=dtype, attn_implementation="sdpa")
+        except ValueError:
+            return T5ForConditionalGeneration.from_pretrained(model_dir, dtype=dtype, attn_implementation="eager")
+
+    @staticmethod
+    def _load_onnxrt_model(model_dir: str):
+        """Load the ONNX export under `model_dir/onnx` on the CUDA execution provider.
+
+        The export is created and saved on first use. IO binding keeps inputs, outputs and
+        the decoder cache on the GPU between decoding steps; generate() is unchanged.
+        """
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except Exception as exc:
+            raise RuntimeError("backend='onnxrt' requires `optimum[onnxruntime-gpu]` package.") from exc
+
+        onnx_dir = os.path.join(model_dir, "onnx")
+        ort_kwargs = {"provider": "CUDAExecutionProvider", "use_io_binding": True}
+        if os.path.isdir(onnx_dir):
+            return ORTModelForSeq2SeqLM.from_pretrained(onnx_dir, **ort_kwargs)
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_dir, export=True, **ort_kwargs)
+        model.save_pretrained(onnx_dir)
+        return model
+
+    @staticmethod
+    def _load_tokenizer(model_dir: str) -> T5TokenizerFast | T5Tokenizer:
+        # The Rust-backed fast tokenizer is much cheaper on batched prompts; keep the
+        # SentencePiece one for checkpoints it cannot be built from.
+        try:
+            return T5TokenizerFast.from_pretrained(model_dir)
+        except (OSError, ValueError):
+            return T5Tokenizer.from_pretrained(model_dir)
 
     def _build_prompt(self, sentence: str, node: Dict) -> str:
         return (
-            "Write one short educational linguistic note in natural English. "
-            "Do not output field names, labels, placeholders, booleans, or JSON fragments. "
+            f"{_NOTE_PROMPT_PREFIX}"
             f"Sentence: {sentence} "
             f"Node type: {node['type']}. "
             f"Part of speech: {node['part_of_speech']}. "
@@ -81,8 +197,7 @@ class LocalT5Annotator:
 
     def _build_template_id_prompt(self, sentence: str, node: Dict) -> str:
         return (
-            "Predict exactly one template_id for this linguistic node. "
-            "Output only the template_id token and nothing else. "
+            f"{_TEMPLATE_ID_PROMPT_PREFIX}"
             f"Sentence: {sentence} "
             f"Node type: {node.get('type')} "
             f"Part of speech: {node.get('part_of_speech')} "
@@ -94,7 +209,7 @@ class LocalT5Annotator:
         )
 
     def _extract_template_id(self, raw: str) -> str:
-        text = sanitize_note(raw).strip()
+        text = self._analyze_note(raw).text.strip()
         if not text:
             return ""
         first = text.split("|", 1)[0].strip().upper()
@@ -103,73 +218,356 @@ class LocalT5Annotator:
         whole = text.upper()
         if whole in self._template_ids:
             return whole
-        for token in re.findall(r"[A-Z_]{4,}", whole):
+        for token in _TEMPLATE_TOKEN_RE.findall(whole):
             if token in self._template_ids:
                 return token
         return ""
 
-    def _generate_template_note(self, node: Dict) -> tuple[str, str, Dict[str, object]]:
-        candidates = select_template_candidates(node)
-        rejected_semantic = []
-        for selection in candidates:
-            template_id = (selection.template_id or "").strip()
-            if not template_id:
-                continue
-            if not is_template_semantically_compatible(node, template_id):
-                rejected_semantic.append({"template_id": template_id, "level": selection.level})
-                continue
-            note = render_template_note(template_id, node, selection.matched_key or "")
-            trace = self._trace_from_selection(
-                selection,
-                selection_mode=self._selection_mode_for_rule(selection),
-                node=node,
-            )
-            if rejected_semantic:
-                trace["semantic_rejects"] = rejected_semantic
-            return template_id, sanitize_note(note), trace
-        fallback = candidates[-1]
-        trace = self._trace_from_selection(
-            fallback,
-            selection_mode=self._selection_mode_for_rule(fallback),
-            node=node,
-        )
-        trace["template_id"] = None
-        trace["semantic_rejects"] = rejected_semantic
-        return "", "", trace
-
-    def _generate(self, prompt: str, *, do_sample: bool, temperature: float) -> str:
-        enc = self.tokenizer(
-            prompt,
-            return_tensors="pt",
-            truncation=True,
-            max_length=self.max_input_length,
+    def _generate(self, prompt: str, *, max_length: int | None = None, encode=None) -> str:
+        cached = self._prefetched_outputs.get(prompt)
+        if cached is None:
+            cached = self._cached_greedy_output(prompt)
+        if cached is not None:
+            return cached
+        encoded = encode() if encode is not None else self._encode_batch([prompt])
+        text = self._generate_from_encoded(encoded, max_length=max_length)[0]
+        self._store_greedy_output(prompt, text)
+        return text
+
+    def _sample_retries(
+        self, prompt: str, temperature: float, *, max_length: int | None = None, encode=None
+    ) -> List[str]:
+        """Return `max_retries` sampled candidates for a prompt whose greedy output was rejected.
+
+        All candidates come from one `generate` call (`num_return_sequences`), so the
+        encoder runs once and the decoder steps are batched instead of one pass per retry.
+        """
+        planned = self._planned_samples.pop(prompt, None)
+        if planned is not None:
+            return planned
+        if self.max_retries < 1:
+            return []
+        return self._generate_from_encoded(
+            encode() if encode is not None else self._encode_batch([prompt]),
+            do_sample=True,
+            temperature=temperature,
+            num_return_sequences=self.max_retries,
+            max_length=max_length,
         )
-        enc = {k: v.to(self.device) for k, v in enc.items()}
 
+    def _generation_kwargs(
+        self,
+        *,
+        do_sample: bool,
+        temperature: float,
+        num_return_sequences: int = 1,
+        max_length: int | None = None,
+    ) -> Dict[str, object]:
         generation_kwargs = {
-            "max_length": self.max_target_length,
+            "max_length": max_length or self.max_target_length,
             "num_beams": 1,
             "do_sample": do_sample,
+            "use_cache": True,
+            # Only the token ids are read back; don't collect per-step attentions/hidden states.
+            "return_dict_in_generate": False,
+            "output_attentions": False,
+            "output_hidden_states": False,
+            "eos_token_id": self.tokenizer.eos_token_id,
+            # Finished rows of a batch are padded rather than extended, and generation returns
+            # as soon as every row has hit EOS instead of running to max_length.
+            "pad_token_id": self.tokenizer.pad_token_id,
         }
         if do_sample:
             generation_kwargs["temperature"] = temperature
             generation_kwargs["top_p"] = 0.9
+        if num_return_sequences > 1:
+            generation_kwargs["num_return_sequences"] = num_return_sequences
+        if self.compile_model:
+            # A fixed-size KV cache keeps decoder shapes constant so the compiled step's CUDA
+            # graphs are replayed instead of re-recorded as the output grows.
+            generation_kwargs["cache_implementation"] = "static"
+        return generation_kwargs
+
+    def _encode(self, prompts: str | List[str]) -> Dict[str, torch.Tensor]:
+        return self._to_device(self._tokenize(prompts))
+
+    def _to_device(self, enc: Dict[str, torch.Tensor]) -> Dict[str, torch.Tensor]:
+        non_blocking = self.device.type == "cuda"
+        return {k: v.to(self.device, non_blocking=non_blocking) for k, v in enc.items()}
+
+    def _tokenize(self, prompts: str | List[str]) -> Dict[str, torch.Tensor]:
+        """Tokenize on the CPU; tensors are pinned when they are headed for a GPU."""
+        compiled = self.compile_model
+        with self._tokenizer_lock:
+            enc = self.tokenizer(
+                prompts,
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=self.max_input_length,
+                # Pad to the longest prompt in the batch, rounded up for tensor-core friendly shapes;
+                # compiled models use the coarser length buckets instead.
+                pad_to_multiple_of=None if compiled else 8,
+            )
+        enc = self._pad_to_bucket(enc) if compiled else dict(enc)
+        if self.device.type == "cuda":
+            enc = {k: v.pin_memory() for k, v in enc.items()}
+        return enc
+
+    def _pad_to_bucket(self, enc) -> Dict[str, torch.Tensor]:
+        length = enc["input_ids"].shape[-1]
+        target = next((bucket for bucket in _INPUT_LENGTH_BUCKETS if bucket >= length), length)
+        target = max(length, min(target, self.max_input_length))
+        extra = target - length
+        if extra <= 0:
+            return dict(enc)
+        return {
+            "input_ids": torch.nn.functional.pad(enc["input_ids"], (0, extra), value=self.tokenizer.pad_token_id),
+            "attention_mask": torch.nn.functional.pad(enc["attention_mask"], (0, extra), value=0),
+        }
+
+    @staticmethod
+    def _inference_mode():
+        # annotate() enters inference mode once per document (and per worker thread), so the
+        # per-forward contexts below only open one when called outside of it.
+        return nullcontext() if torch.is_inference_mode_enabled() else torch.inference_mode()
+
+    def _autocast(self) -> torch.autocast:
+        return torch.autocast(
+            device_type=self.device.type if self.device is not None else "cpu",
+            dtype=torch.bfloat16,
+            enabled=self._bf16_autocast,
+        )
+
+    def _cached_greedy_output(self, prompt: str) -> str | None:
+        with self._greedy_cache_lock:
+            if prompt not in self._greedy_cache:
+                return None
+            self._greedy_cache.move_to_end(prompt)
+            return self._greedy_cache[prompt]
+
+    def _store_greedy_output(self, prompt: str, text: str) -> None:
+        if self.generation_cache_size <= 0:
+            return
+        with self._greedy_cache_lock:
+            self._greedy_cache[prompt] = text
+            self._greedy_cache.move_to_end(prompt)
+            while len(self._greedy_cache) > self.generation_cache_size:
+                self._greedy_cache.popitem(last=False)
+
+    def _encode_batch(self, prompts: List[str], tokenized: Dict[str, torch.Tensor] | None = None) -> Dict[str, object]:
+        """Tokenize a batch (unless already tokenized) and, on the torch backend, run the encoder once.
+
+        The returned inputs can be decoded from repeatedly (greedy pass, then sampled
+        retries on a subset of rows) without re-encoding the prompts.
+        """
+        enc = self._to_device(tokenized if tokenized is not None else self._tokenize(prompts))
+        if self.backend != "torch":
+            return enc
+        with self._inference_mode(), self._autocast():
+            encoder_outputs = self.model.get_encoder()(
+                input_ids=enc["input_ids"],
+                attention_mask=enc["attention_mask"],
+                return_dict=True,
+            )
+        return {"encoder_outputs": encoder_outputs, "attention_mask": enc["attention_mask"]}
 
-        with torch.no_grad():
-            out = self.model.generate(**enc, **generation_kwargs)
-        return self.tokenizer.decode(out[0], skip_special_tokens=True).strip()
+    @staticmethod
+    def _select_rows(encoded: Dict[str, object], rows: List[int]) -> Dict[str, object]:
+        index = torch.tensor(rows, device=encoded["attention_mask"].device)
+        selected: Dict[str, object] = {}
+        for key, value in encoded.items():
+            if key == "encoder_outputs":
+                selected[key] = BaseModelOutput(last_hidden_state=value.last_hidden_state.index_select(0, index))
+            else:
+                selected[key] = value.index_select(0, index)
+        return selected
+
+    def _generate_from_encoded(
+        self,
+        encoded: Dict[str, object],
+        rows: List[int] | None = None,
+        *,
+        do_sample: bool = False,
+        temperature: float = 1.0,
+        num_return_sequences: int = 1,
+        max_length: int | None = None,
+    ) -> List[str]:
+        inputs = encoded if rows is None else self._select_rows(encoded, rows)
+        generation_kwargs = self._generation_kwargs(
+            do_sample=do_sample,
+            temperature=temperature,
+            num_return_sequences=num_return_sequences,
+            max_length=max_length,
+        )
+        with self._inference_mode(), self._autocast():
+            out = self.model.generate(**inputs, **generation_kwargs)
+        with self._tokenizer_lock:
+            texts = self.tokenizer.batch_decode(out, skip_special_tokens=True)
+        return [text.strip() for text in texts]
+
+    def _retry_policy(self):
+        """Return (accept, temperature, max_length) matching the active mode's per-node retry loop."""
+        if self.note_mode == "two_stage":
+
+            def accept(raw: str) -> bool:
+                return bool(self._extract_template_id(raw))
+
+            return accept, _TEMPLATE_RETRY_TEMPERATURE, self._template_id_max_length()
+
+        def accept(raw: str) -> bool:
+            return self._analyze_note(raw).is_valid
+
+        return accept, _NOTE_RETRY_TEMPERATURE, None
+
+    def _template_id_max_length(self) -> int:
+        """Decoder length cap for template-id prompts: the longest registry id plus a little slack.
+
+        Counts the decoder start token and `</s>` on top of the id's pieces, so a well-formed
+        answer always fits while garbage outputs stop long before `max_target_length`.
+        """
+        if self._template_id_length is None:
+            with self._tokenizer_lock:
+                longest = max((len(self.tokenizer.tokenize(tid)) for tid in self._template_ids), default=0)
+            self._template_id_length = min(self.max_target_length, longest + 4) if longest else self.max_target_length
+        return self._template_id_length
+
+    def _prefetch_generations(self, prompts: List[str]) -> None:
+        """Batch the greedy pass and the sampled retries for a document's prompts.
+
+        Greedy outputs go to `_prefetched_outputs` for `_generate` (and to the LRU cache for
+        later calls); sampled retries go to `_planned_samples` for `_sample_retries`. Each chunk is encoded once, and the rows
+        whose greedy output would be rejected get all their retry candidates from a single
+        sampled decode over the same encoder outputs.
+        """
+        accept, temperature, max_length = self._retry_policy()
+        needs_greedy: List[str] = []
+        needs_retry: List[str] = []
+        # Chunk prompts of similar length together so each batch pads only to its own longest row.
+        for prompt in sorted(dict.fromkeys(prompts), key=len):
+            cached = self._cached_greedy_output(prompt)
+            if cached is None:
+                needs_greedy.append(prompt)
+                continue
+            self._prefetched_outputs[prompt] = cached
+            if not accept(cached):
+                needs_retry.append(prompt)
+
+        for chunk, tokenized in self._iter_tokenized_chunks(needs_greedy):
+            encoded = self._encode_batch(chunk, tokenized)
+            texts = self._generate_from_encoded(encoded, max_length=max_length)
+            for prompt, text in zip(chunk, texts):
+                self._prefetched_outputs[prompt] = text
+                self._store_greedy_output(prompt, text)
+            rejected_rows = [row for row, text in enumerate(texts) if not accept(text)]
+            self._plan_sampled_retries(chunk, encoded, rejected_rows, temperature, max_length)
+
+        for chunk, tokenized in self._iter_tokenized_chunks(needs_retry):
+            self._plan_sampled_retries(
+                chunk, self._encode_batch(chunk, tokenized), list(range(len(chunk))), temperature, max_length
+            )
+
+    def _iter_tokenized_chunks(self, prompts: List[str]) -> Iterator[tuple[List[str], Dict[str, torch.Tensor]]]:
+        """Yield `batch_size` chunks with their tokenized inputs, tokenizing one chunk ahead.
+
+        The next chunk is tokenized on a helper thread while the caller runs the model on
+        the current one, so CPU-side tokenization overlaps GPU work.
+        """
+        chunks = [prompts[start : start + self.batch_size] for start in range(0, len(prompts), self.batch_size)]
+        if len(chunks) < 2:
+            for chunk in chunks:
+                yield chunk, self._tokenize(chunk)
+            return
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = pool.submit(self._tokenize, chunks[0])
+            for idx, chunk in enumerate(chunks):
+                tokenized = pending.result()
+                if idx + 1 < len(chunks):
+                    pending = pool.submit(self._tokenize, chunks[idx + 1])
+                yield chunk, tokenized
+
+    def _plan_sampled_retries(self, chunk, encoded, rows, temperature: float, max_length: int | None) -> None:
+        per_prompt = self.max_retries
+        if not rows or per_prompt < 1:
+            return
+        texts = self._generate_from_encoded(
+            encoded,
+            rows,
+            do_sample=True,
+            temperature=temperature,
+            num_return_sequences=per_prompt,
+            max_length=max_length,
+        )
+        for idx, row in enumerate(rows):
+            self._planned_samples[chunk[row]] = texts[idx * per_prompt : (idx + 1) * per_prompt]
+
+    def _collect_generation_prompts(self, contract_doc: Dict[str, Dict]) -> List[str]:
+        """List the prompts `_annotate_node` will send to the model for this document.
+
+        llm mode asks for a note on every node; two_stage only asks for a template_id when
+        the rule registry has no exact/drop-TAM match; hybrid only asks for a note when the
+        rule template note would be rejected. The hybrid check tracks duplicates from rule
+        notes only, so a node that turns out to need the model anyway is simply generated
+        on its own later.
+        """
+        prompts: List[str] = []
+        for sentence_text, sentence_node in contract_doc.items():
+            seen_rule_notes: Set[str] = set()
+            for node in self._iter_subtree(sentence_node):
+                self._normalize_tam_for_node(node)
+                if self.note_mode == "two_stage":
+                    candidates = select_template_candidates(node)
+                    if not self._is_deterministic_selection(candidates[0] if candidates else None):
+                        prompts.append(self._build_template_id_prompt(sentence_text, node))
+                elif self.note_mode == "hybrid":
+                    if not self._rule_note_accepted(node, seen_rule_notes):
+                        prompts.append(self._build_prompt(sentence_text, node))
+                else:
+                    prompts.append(self._build_prompt(sentence_text, node))
+        return prompts
+
+    def _rule_note_accepted(self, node: Dict, seen_notes: Set[str]) -> bool:
+        """Whether hybrid mode would keep the rule template note for `node` (records it in `seen_notes`)."""
+        _, template_note, _ = self._generate_template_note(node)
+        if not template_note:
+            return False
+        analysis = self._analyze_note(template_note)
+        view = self._node_view(node)
+        should_dedupe = view.type != "Word"
+        if should_dedupe and analysis.normalized in seen_notes:
+            return False
+        if not self._is_note_suitable_for_node(node, template_note, analysis=analysis, view=view):
+            return False
+        if should_dedupe:
+            seen_notes.add(analysis.normalized)
+        return True
+
+    def _iter_retry_outputs(self, prompt: str, temperature: float, max_length: int | None = None) -> Iterator[str]:
+        """Yield the greedy output, then (only if the caller keeps iterating) the sampled retries.
+
+        When neither the greedy cache nor the prefetch pass covered the prompt, the encoder
+        runs at most once and its outputs are shared by the greedy and sampled calls.
+        """
+        encoded: List[Dict[str, object]] = []
+
+        def encode() -> Dict[str, object]:
+            if not encoded:
+                encoded.append(self._encode_batch([prompt]))
+            return encoded[0]
+
+        yield self._generate(prompt, max_length=max_length, encode=encode)
+        yield from self._sample_retries(prompt, temperature, max_length=max_length, encode=encode)
 
     def _generate_note_with_retry(self, prompt: str) -> tuple[str, List[Dict[str, str]]]:
         candidates: List[str] = []
         rejected: List[Dict[str, str]] = []
-        attempts = max(1, self.max_retries + 1)
 
-        for attempt in range(attempts):
-            do_sample = attempt > 0
-            temperature = 0.8 + (0.1 * attempt)
-            note = sanitize_note(self._generate(prompt, do_sample=do_sample, temperature=temperature))
+        for raw in self._iter_retry_outputs(prompt, _NOTE_RETRY_TEMPERATURE):
+            # Memoized per raw output: the prefetch pass already analyzed these to plan retries.
+            analysis = self._analyze_note(raw)
+            note = analysis.text
             candidates.append(note)
-            if is_valid_note(note):
+            if analysis.is_valid:
                 return note, rejected
             if note:
                 rejected.append({"text": note, "reason": "MODEL_OUTPUT_LOW_QUALITY"})
@@ -181,18 +579,14 @@ class LocalT5Annotator:
 
     def _predict_template_id_with_retry(self, prompt: str) -> tuple[str, List[Dict[str, str]]]:
         rejected: List[Dict[str, str]] = []
-        attempts = max(1, self.max_retries + 1)
         seen_tokens: Set[str] = set()
-        for attempt in range(attempts):
-            do_sample = attempt > 0
-            temperature = 0.7 + (0.1 * attempt)
-            raw = self._generate(prompt, do_sample=do_sample, temperature=temperature)
+        for raw in self._iter_retry_outputs(prompt, _TEMPLATE_RETRY_TEMPERATURE, self._template_id_max_length()):
             template_id = self._extract_template_id(raw)
             if template_id:
                 return template_id, rejected
             # Keep only template-like tokens in rejection diagnostics; drop free-form model text noise.
-            token = sanitize_note(raw).strip().upper()
-            if token and re.fullmatch(r"[A-Z_]{4,}", token) and token not in seen_tokens:
+            token = self._analyze_note(raw).text.strip().upper()
+            if token and _TEMPLATE_TOKEN_RE.fullmatch(token) and token not in seen_tokens:
                 seen_tokens.add(token)
                 rejected.append({"text": token, "reason": "MODEL_OUTPUT_LOW_QUALITY"})
         return "", rejected
@@ -208,298 +602,46 @@ class LocalT5Annotator:
             node_content=node.get("content"),
         )
 
-    @staticmethod
-    def _matched_context_key(selection) -> str | None:
-        level = (selection.level or "").strip().upper()
-        if level == "L1_EXACT":
-            return selection.context_key_l1
-        if level == "L2_DROP_TAM":
-            return selection.context_key_l2
-        if level.startswith("L3"):
-            return selection.context_key_l3
-        return selection.matched_key
-
-    def _selection_mode_for_rule(self, selection) -> str:
-        level = (selection.level or "").strip().upper()
-        if level == "L1_EXACT":
-            return "rule_l1_exact"
-        if level == "L2_DROP_TAM":
-            return "rule_l2_drop_tam"
-        if level.startswith("L3"):
-            return "rule_l3_backoff"
-        return "rule_fallback"
-
-    def _selection_mode_for_model(self, selection) -> str:
-        level = (selection.level or "").strip().upper()
-        if level == "L1_EXACT":
-            return "model_l1_exact"
-        if level == "L2_DROP_TAM":
-            return "model_l2_drop_tam"
-        if level.startswith("L3"):
-            return "model_l3_backoff"
-        return "model_predicted_template"
-
-    def _is_tam_relevant_node(self, node: Dict) -> bool:
-        node_pos = str(node.get("part_of_speech") or "").strip().lower()
-        return node_pos in self._TAM_RELEVANT_POS
-
-    def _trace_from_selection(self, selection, *, selection_mode: str, node: Dict | None = None) -> Dict[str, object]:
-        trace = {
-            "level": selection.level,
-            "template_id": selection.template_id,
-            "matched_key": selection.matched_key,
-            "registry_version": selection.registry_version,
-            "context_key_l1": selection.context_key_l1,
-            "context_key_l2": selection.context_key_l2,
-            "context_key_l3": selection.context_key_l3,
-            "context_key_matched": self._matched_context_key(selection),
-            "selection_mode": selection_mode,
-        }
-        if selection.level == "L2_DROP_TAM" and node and self._is_tam_relevant_node(node):
-            trace["matched_level_reason"] = "tam_dropped"
-        return trace
-
-    def _match_selection_for_template_id(self, node: Dict, template_id: str) -> Dict[str, object]:
-        candidates = select_template_candidates(node)
-        for c in candidates:
-            if (c.template_id or "").strip() == template_id:
-                return self._trace_from_selection(
-                    c,
-                    selection_mode=self._selection_mode_for_model(c),
-                    node=node,
-                )
-        fallback = candidates[-1]
-        trace = self._trace_from_selection(
-            fallback,
-            selection_mode=self._selection_mode_for_model(fallback),
-            node=node,
-        )
-        trace["level"] = "MODEL_PREDICTED"
-        trace["template_id"] = template_id
-        return trace
-
-    def _is_note_suitable_for_node(self, node: Dict, note: str) -> bool:
-        if not is_valid_note(note):
-            return False
-
-        node_type = (node.get("type") or "").strip()
-        content = sanitize_note(str(node.get("content", ""))).lower()
-        note_l = sanitize_note(note).lower()
-
-        if fails_semantic_sanity(
-            note_l,
-            node_type=node.get("type"),
-            node_part_of_speech=node.get("part_of_speech"),
-            node_content=node.get("content"),
-        ):
-            return False
-
-        if node_type == "Word":
-            # Force strict lexical anchoring in quoted form to suppress generic noise.
-            if content and f"'{content}'" not in note_l:
-                return False
-            return True
-
-        if node_type == "Phrase":
-            if "phrase" not in note_l:
-                return False
-            phrase_tokens = [t for t in re.findall(r"[a-z]+", content) if len(t) >= 4]
-            if phrase_tokens and not any(tok in note_l for tok in phrase_tokens[:2]):
-                return False
-            return True
-
-        if node_type == "Sentence":
-            if "sentence" not in note_l:
-                return False
-            tense = (node.get("tense") or "").lower()
-            if tense == "past" and "present simple" in note_l:
-                return False
-            if tense == "present" and "past simple" in note_l:
-                return False
-            return True
-
-        return True
-
-    @staticmethod
-    def _normalize_tam_for_node(node: Dict) -> None:
-        node_type = str(node.get("type", "")).strip().lower()
-        pos = str(node.get("part_of_speech", "")).strip().lower()
-
-        if node_type == "word":
-            if pos not in {"verb", "auxiliary verb"}:
-                for field in ("tense", "aspect", "mood", "voice", "finiteness"):
-                    node[field] = "null"
-            return
-
-        if node_type == "phrase":
-            if pos in {"noun phrase", "prepositional phrase"}:
-                for field in ("tense", "aspect", "mood", "voice", "finiteness"):
-                    node[field] = "null"
-                return
-
-            # For non-verbal phrases, mood/voice/finiteness are usually not meaningful.
-            if pos not in {"verb phrase"}:
-                for field in ("mood", "voice", "finiteness"):
-                    node[field] = "null"
-
-    @staticmethod
-    def _kind_from_template_id(template_id: str) -> str | None:
-        tid = (template_id or "").strip().upper()
-        if not tid:
-            return None
-        if tid.startswith("WORD_"):
-            return "morphological"
-        if tid.startswith("SENTENCE_") or tid.startswith("CLAUSE_"):
-            return "syntactic"
-        if tid.startswith(("VP_", "NP_", "PP_", "PHRASE_")):
-            return "syntactic"
-        return None
-
-    def _infer_note_kind(self, node: Dict, note: str, template_id: str | None = None) -> str:
-        template_kind = self._kind_from_template_id(template_id or "")
-        if template_kind:
-            return template_kind
-        note_l = sanitize_note(note).lower()
-        if any(marker in note_l for marker in ("tense", "aspect", "voice", "mood", "verb form", "plural", "singular")):
-            return "morphological"
-        if any(marker in note_l for marker in ("subject", "predicate", "object", "clause", "phrase", "sentence", "agreement")):
-            return "syntactic"
-        if any(marker in note_l for marker in ("topic", "context", "cohesion", "register", "emphasis")):
-            return "discourse"
-        return "semantic"
-
-    def _build_typed_note(self, node: Dict, note: str, source: str, template_id: str | None = None) -> Dict[str, object]:
-        return {
-            "text": note,
-            "kind": self._infer_note_kind(node, note, template_id=template_id),
-            "confidence": 0.85 if source == "model" else 0.65,
-            "source": source,
-        }
-
-    @staticmethod
-    def _with_backoff_flag(base_flags: List[str], template_trace: Dict[str, object] | None) -> List[str]:
-        flags = list(base_flags)
-        level = str((template_trace or {}).get("level") or "").upper()
-        if level and level != "L1_EXACT" and "backoff_used" not in flags:
-            flags.append("backoff_used")
-        return flags
-
     def annotate(self, contract_doc: Dict[str, Dict]) -> Dict[str, Dict]:
-        for sentence_text, sentence_node in contract_doc.items():
-            seen_notes: Set[str] = set()
-            self._annotate_node(sentence_text, sentence_node, seen_notes)
-            self._ensure_backoff_flags_consistency(sentence_node)
-            self._mark_backoff_in_subtree(sentence_node)
-            backoff_node_ids, backoff_leaf_node_ids, backoff_reasons, unique_spans = self._collect_backoff_summary(
-                sentence_node
-            )
-            sentence_node["backoff_nodes_count"] = len(backoff_node_ids)
-            sentence_node["backoff_leaf_nodes_count"] = len(backoff_leaf_node_ids)
-            sentence_node["backoff_aggregate_nodes_count"] = max(
-                0,
-                sentence_node["backoff_nodes_count"] - sentence_node["backoff_leaf_nodes_count"],
-            )
-            sentence_node["backoff_unique_spans_count"] = len(unique_spans)
-            if self.backoff_debug_summary:
-                sentence_node["backoff_summary"] = {
-                    "nodes": backoff_node_ids,
-                    "leaf_nodes": backoff_leaf_node_ids,
-                    "aggregate_nodes_count": sentence_node["backoff_aggregate_nodes_count"],
-                    "unique_spans": unique_spans,
-                    "reasons": backoff_reasons,
-                }
-            else:
-                sentence_node.pop("backoff_summary", None)
-        return contract_doc
-
-    @staticmethod
-    def _ensure_backoff_flags_consistency(node: Dict) -> None:
-        level = str(((node.get("template_selection") or {}).get("level")) or "").strip().upper()
-        if level and level != "L1_EXACT":
-            flags = node.get("quality_flags")
-            if not isinstance(flags, list):
-                flags = []
-            if "backoff_used" not in flags:
-                flags.append("backoff_used")
-            node["quality_flags"] = flags
-
-        for child in node.get("linguistic_elements", []) or []:
-            if isinstance(child, dict):
-                LocalT5Annotator._ensure_backoff_flags_consistency(child)
-
-    @staticmethod
-    def _mark_backoff_in_subtree(node: Dict) -> bool:
-        local_backoff = "backoff_used" in (node.get("quality_flags") or [])
-        has_descendant_backoff = False
-
-        for child in node.get("linguistic_elements", []) or []:
-            if not isinstance(child, dict):
-                continue
-            if LocalT5Annotator._mark_backoff_in_subtree(child):
-                has_descendant_backoff = True
-
-        node["backoff_in_subtree"] = has_descendant_backoff
-        return local_backoff or has_descendant_backoff
-
-    @staticmethod
-    def _collect_backoff_summary(node: Dict) -> tuple[List[str], List[str], List[str], List[str]]:
-        node_ids: List[str] = []
-        leaf_node_ids: List[str] = []
-        reasons: Set[str] = set()
-        unique_span_keys: Set[str] = set()
-
-        def walk(cur: Dict) -> None:
-            flags = cur.get("quality_flags") or []
-            if isinstance(flags, list) and "backoff_used" in flags:
-                node_id = cur.get("node_id")
-                if isinstance(node_id, str):
-                    node_ids.append(node_id)
-                    if str(cur.get("type") or "").strip() != "Sentence":
-                        leaf_node_ids.append(node_id)
-                        span = cur.get("source_span")
-                        if isinstance(span, dict):
-                            start = span.get("start")
-                            end = span.get("end")
-                            if isinstance(start, int) and isinstance(end, int):
-                                unique_span_keys.add(f"{start}:{end}")
-                reason = str((cur.get("template_selection") or {}).get("matched_level_reason") or "").strip()
-                if reason:
-                    reasons.add(reason)
-                else:
-                    reasons.add("level_backoff")
-            for child in cur.get("linguistic_elements", []) or []:
-                if isinstance(child, dict):
-                    walk(child)
-
-        walk(node)
-        return node_ids, leaf_node_ids, sorted(reasons), sorted(unique_span_keys)
+        """Annotate every sentence tree in place. Model outputs are inference tensors (eval only)."""
+        with torch.inference_mode():
+            try:
+                if self.note_mode in {"llm", "hybrid", "two_stage"}:
+                    # Run the greedy pass and the sampled retry rounds for the whole document in
+                    # batches instead of one forward pass per node and attempt.
+                    self._prefetch_generations(self._collect_generation_prompts(contract_doc))
+                return super().annotate(contract_doc)
+            finally:
+                self._prefetched_outputs.clear()
+                self._planned_samples.clear()
+
+    def _annotate_sentence_in_worker(self, item: tuple[str, Dict]) -> None:
+        # Inference mode is thread-local, so each pool thread enters it for itself.
+        with torch.inference_mode():
+            self._annotate_sentence(*item)
 
     def _annotate_node(self, sentence_text: str, node: Dict, seen_notes: Set[str]) -> None:
-        self._normalize_tam_for_node(node)
-        node["quality_flags"] = []
-        node["rejected_candidates"] = []
-        node["rejected_candidate_stats"] = []
-        node["reason_codes"] = []
+        view = self._prepare_node(node)
 
         if self.note_mode == "two_stage":
-            node_type = (node.get("type") or "").strip()
-            should_dedupe = node_type != "Word"
+            should_dedupe = view.type != "Word"
             candidates = select_template_candidates(node)
             top = candidates[0] if candidates else None
 
             # Prefer exact deterministic mapping in production two-stage mode.
-            if top and top.template_id and top.level in {"L1_EXACT", "L2_DROP_TAM"}:
+            if self._is_deterministic_selection(top):
                 trace = self._trace_from_selection(
                     top,
                     selection_mode=self._selection_mode_for_rule(top),
                     node=node,
                 )
                 note = render_template_note(top.template_id, node, top.matched_key or "")
-                note_norm = sanitize_note(note).lower()
+                note_analysis = self._analyze_note(note)
+                note_norm = note_analysis.normalized
                 is_new = (note_norm not in seen_notes) if should_dedupe else True
-                if note and self._is_note_suitable_for_node(node, note) and is_new:
+                if note and self._is_note_suitable_for_node(node, note, analysis=note_analysis, view=view) and is_new:
                     node["linguistic_notes"] = [note]
-                    node["notes"] = [self._build_typed_note(node, note, source="rule", template_id=top.template_id)]
+                    node["notes"] = [self._build_typed_note(node, note, source="rule", template_id=top.template_id, analysis=note_analysis)]
                     node["quality_flags"] = self._with_backoff_flag(["template_selected", "rule_used"], trace)
                     node["reason_codes"] = ["RULE_TEMPLATE_ACCEPTED"]
                     node["template_selection"] = trace
@@ -513,20 +655,19 @@ class LocalT5Annotator:
                     node["template_selection"] = trace
                 node["rejected_candidates"] = []
                 node["rejected_candidate_stats"] = []
-                for child in node.get("linguistic_elements", []):
-                    self._annotate_node(sentence_text, child, seen_notes)
                 return
 
             prompt = self._build_template_id_prompt(sentence_text, node)
             predicted_template_id, rejected_items = self._predict_template_id_with_retry(prompt)
             if predicted_template_id and is_template_semantically_compatible(node, predicted_template_id):
-                selection = self._match_selection_for_template_id(node, predicted_template_id)
+                selection = self._match_selection_for_template_id(node, predicted_template_id, candidates)
                 note = render_template_note(predicted_template_id, node, str(selection.get("matched_key") or ""))
-                note_norm = sanitize_note(note).lower()
+                note_analysis = self._analyze_note(note)
+                note_norm = note_analysis.normalized
                 is_new = (note_norm not in seen_notes) if should_dedupe else True
-                if note and self._is_note_suitable_for_node(node, note) and is_new:
+                if note and self._is_note_suitable_for_node(node, note, analysis=note_analysis, view=view) and is_new:
                     node["linguistic_notes"] = [note]
-                    node["notes"] = [self._build_typed_note(node, note, source="rule", template_id=predicted_template_id)]
+                    node["notes"] = [self._build_typed_note(node, note, source="rule", template_id=predicted_template_id, analysis=note_analysis)]
                     node["quality_flags"] = self._with_backoff_flag(
                         ["model_predicted_template", "template_selected"],
                         selection,
@@ -542,12 +683,13 @@ class LocalT5Annotator:
                     node["reason_codes"] = ["NO_TEMPLATE_FOUND"]
                     node["template_selection"] = selection
             else:
-                fallback_template_id, fallback_note, fallback_trace = self._generate_template_note(node)
-                fallback_norm = sanitize_note(fallback_note).lower()
+                fallback_template_id, fallback_note, fallback_trace = self._generate_template_note(node, candidates)
+                fallback_analysis = self._analyze_note(fallback_note)
+                fallback_norm = fallback_analysis.normalized
                 fallback_is_new = (fallback_norm not in seen_notes) if should_dedupe else True
                 if fallback_note and fallback_is_new:
                     node["linguistic_notes"] = [fallback_note]
-                    node["notes"] = [self._build_typed_note(node, fallback_note, source="rule", template_id=fallback_template_id)]
+                    node["notes"] = [self._build_typed_note(node, fallback_note, source="rule", template_id=fallback_template_id, analysis=fallback_analysis)]
                     node["quality_flags"] = self._with_backoff_flag(["template_selected", "rule_used"], fallback_trace)
                     node["reason_codes"] = ["RULE_TEMPLATE_ACCEPTED"]
                     node["template_selection"] = fallback_trace
@@ -563,66 +705,28 @@ class LocalT5Annotator:
             deduped_rejected, rejected_stats = self._build_rejection_stats(node, rejected_items)
             node["rejected_candidates"] = deduped_rejected
             node["rejected_candidate_stats"] = rejected_stats
-            for child in node.get("linguistic_elements", []):
-                self._annotate_node(sentence_text, child, seen_notes)
             return
 
         # Stage A/B deterministic path: classify template_id -> render note.
         if self.note_mode in {"template_only", "hybrid"}:
-            template_id, template_note, template_trace = self._generate_template_note(node)
-            norm_template_note = sanitize_note(template_note).lower()
-            node_type = (node.get("type") or "").strip()
-            should_dedupe = node_type != "Word"
-            template_is_new = (norm_template_note not in seen_notes) if should_dedupe else True
-            if template_note and self._is_note_suitable_for_node(node, template_note) and template_is_new:
-                node["linguistic_notes"] = [template_note]
-                node["notes"] = [self._build_typed_note(node, template_note, source="rule", template_id=template_id)]
-                node["quality_flags"] = self._with_backoff_flag(
-                    ["note_generated", "rule_used", "template_selected"],
-                    template_trace,
-                )
-                node["reason_codes"] = ["RULE_TEMPLATE_NOTE_ACCEPTED"]
-                node["template_selection"] = template_trace
-                if should_dedupe:
-                    seen_notes.add(norm_template_note)
-                for child in node.get("linguistic_elements", []):
-                    self._annotate_node(sentence_text, child, seen_notes)
-                return
-            if self.note_mode == "template_only":
-                fallback_note = build_fallback_note(node)
-                fallback_norm = sanitize_note(fallback_note).lower()
-                fallback_is_new = (fallback_norm not in seen_notes) if should_dedupe else True
-                if self._is_note_suitable_for_node(node, fallback_note) and fallback_is_new:
-                    node["linguistic_notes"] = [fallback_note]
-                    node["notes"] = [self._build_typed_note(node, fallback_note, source="rule", template_id=None)]
-                    node["quality_flags"] = ["note_generated", "rule_used", "template_fallback"]
-                    node["reason_codes"] = ["RULE_TEMPLATE_MISS", "RULE_TEMPLATE_FALLBACK_ACCEPTED"]
-                    node["template_selection"] = template_trace
-                    if should_dedupe:
-                        seen_notes.add(fallback_norm)
-                else:
-                    node["linguistic_notes"] = []
-                    node["notes"] = []
-                    node["quality_flags"] = ["no_note"]
-                    node["reason_codes"] = ["RULE_TEMPLATE_MISS", "NO_VALID_NOTE"]
-                    node["template_selection"] = template_trace
-                for child in node.get("linguistic_elements", []):
-                    self._annotate_node(sentence_text, child, seen_notes)
+            if self._annotate_node_from_templates(
+                node, seen_notes, view, fallback=self.note_mode == "template_only"
+            ):
                 return
 
         # LLM path (legacy) with retry + fallback.
         prompt = self._build_prompt(sentence_text, node)
         note, rejected_items = self._generate_note_with_retry(prompt)
-        norm_note = sanitize_note(note).lower()
-        node_type = (node.get("type") or "").strip()
-        should_dedupe = node_type != "Word"
-        note_is_valid = is_valid_note(note)
-        note_is_suitable = self._is_note_suitable_for_node(node, note)
+        note_analysis = self._analyze_note(note)
+        norm_note = note_analysis.normalized
+        should_dedupe = view.type != "Word"
+        note_is_valid = note_analysis.is_valid
+        note_is_suitable = self._is_note_suitable_for_node(node, note, analysis=note_analysis, view=view)
         is_new_note = (norm_note not in seen_notes) if should_dedupe else True
 
         if note_is_valid and note_is_suitable and is_new_note:
             node["linguistic_notes"] = [note]
-            node["notes"] = [self._build_typed_note(node, note, source="model")]
+            node["notes"] = [self._build_typed_note(node, note, source="model", analysis=note_analysis)]
             node["quality_flags"] = ["note_generated", "model_used"]
             node["reason_codes"] = ["MODEL_NOTE_ACCEPTED"]
             if should_dedupe:
@@ -643,11 +747,12 @@ class LocalT5Annotator:
                 node["reason_codes"].append("DUPLICATE_NOTE")
 
             fallback_note = build_fallback_note(node)
-            fallback_norm = sanitize_note(fallback_note).lower()
+            fallback_analysis = self._analyze_note(fallback_note)
+            fallback_norm = fallback_analysis.normalized
             fallback_is_new = (fallback_norm not in seen_notes) if should_dedupe else True
-            if self._is_note_suitable_for_node(node, fallback_note) and fallback_is_new:
+            if self._is_note_suitable_for_node(node, fallback_note, analysis=fallback_analysis, view=view) and fallback_is_new:
                 node["linguistic_notes"] = [fallback_note]
-                node["notes"] = [self._build_typed_note(node, fallback_note, source="fallback")]
+                node["notes"] = [self._build_typed_note(node, fallback_note, source="fallback", analysis=fallback_analysis)]
                 node["quality_flags"] = ["fallback_used"]
                 node["reason_codes"].append("FALLBACK_NOTE_ACCEPTED")
                 if should_dedupe:
@@ -661,6 +766,3 @@ class LocalT5Annotator:
         deduped_rejected, rejected_stats = self._build_rejection_stats(node, rejected_items)
         node["rejected_candidates"] = deduped_rejected
         node["rejected_candidate_stats"] = rejected_stats
-
-        for child in node.get("linguistic_elements", []):
-            self._annotate_node(sentence_text, child, seen_notes)
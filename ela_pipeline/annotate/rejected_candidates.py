@@ -4,7 +4,9 @@ from __future__ import annotations
 
 import re
 import unicodedata
+from collections import Counter
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Dict, List, Sequence, Tuple
 
 DEFAULT_STOP_LIST = [
@@ -35,6 +37,19 @@ DEFAULT_STOP_LIST = [
     r"\bdoes not\b.*\buse\b",
 ]
 
+_SPACE_BEFORE_PUNCT_RE = re.compile(r"\s+([.,:;!?])")
+_REPEATED_DOTS_RE = re.compile(r"\.{2,}")
+_TRAILING_PUNCT_RE = re.compile(r"\s*([.,:;!?])\s*$")
+_SENTENCE_META_PREFIXES = ("sentence", "sentense")
+_WORDS_RE = re.compile(r"[a-zA-Z']+")
+_LABEL_SPAM_RE = re.compile(r"\b(node|form|tense|word|pos|type)\s*[:;]")
+# Fusing patterns into one alternation renumbers their groups and moves inline flags off the
+# start of the expression, so patterns using backreferences or global inline flags are not fused.
+_GROUP_REFERENCE_RE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+_GLOBAL_INLINE_FLAGS_RE = re.compile(r"\(\?[aiLmsux]+\)")
+_SPAM_TERMS = ("noun", "verb", "phrase", "sentence", "clause", "word")
+_QUOTE_TABLE = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
 
 @dataclass(frozen=True)
 class RejectedCandidateFilterConfig:
@@ -49,62 +64,86 @@ DEFAULT_REJECTED_CANDIDATE_FILTER_CONFIG = RejectedCandidateFilterConfig()
 
 
 def _normalize_quotes(text: str) -> str:
-    table = {
-        ord("“"): '"',
-        ord("”"): '"',
-        ord("‘"): "'",
-        ord("’"): "'",
-    }
-    return text.translate(table)
+    return text.translate(_QUOTE_TABLE)
 
 
 def normalize_candidate_text(text: str, *, use_nfkc: bool = True) -> str:
     out = text or ""
-    if use_nfkc:
-        out = unicodedata.normalize("NFKC", out)
-    out = _normalize_quotes(out)
+    # ASCII text is already NFKC-stable and has no curly quotes to fold.
+    if not out.isascii():
+        if use_nfkc:
+            out = unicodedata.normalize("NFKC", out)
+        out = _normalize_quotes(out)
     out = " ".join(out.strip().split())
-    out = re.sub(r"\s+([.,:;!?])", r"\1", out)
-    out = re.sub(r"\.{2,}", ".", out)
-    out = re.sub(r"\s*([.,:;!?])\s*$", r"\1", out)
-    out = re.sub(r"[.\s]+$", ".", out) if out.endswith(".") or out.endswith(" ") else out
+    out = _SPACE_BEFORE_PUNCT_RE.sub(r"\1", out)
+    out = _REPEATED_DOTS_RE.sub(".", out)
+    out = _TRAILING_PUNCT_RE.sub(r"\1", out)
+    # Whitespace is already collapsed to single spaces, so rstrip covers the old ``[.\s]+$`` tail.
+    out = out.rstrip(". ") + "." if out.endswith((".", " ")) else out
     out = out.strip()
     return out
 
 
 def norm_key(text: str, *, use_nfkc: bool = True) -> str:
     out = normalize_candidate_text(text, use_nfkc=use_nfkc)
-    out = re.sub(r"[.\s]+$", "", out)
+    out = out.rstrip(". ")
     return out.lower()
 
 
 def _is_sentence_like_meta(text: str) -> bool:
-    return bool(re.match(r"^\s*senten(?:ce|se)\b", text, flags=re.IGNORECASE))
+    # Plain prefix probe for ``^\s*senten(?:ce|se)\b``; cheaper than a regex match per candidate.
+    s = text.lstrip()
+    if s[:8].lower() not in _SENTENCE_META_PREFIXES:
+        return False
+    return len(s) == 8 or not (s[8].isalnum() or s[8] == "_")
+
+
+def _has_sentence_template_prefix(text: str) -> bool:
+    # Plain prefix probe for ``^\s*sentence\s*:``.
+    s = text.lstrip()
+    return s[:8].lower() == "sentence" and s[8:].lstrip().startswith(":")
+
+
+def _is_fusable(pattern: str) -> bool:
+    return not (_GROUP_REFERENCE_RE.search(pattern) or _GLOBAL_INLINE_FLAGS_RE.search(pattern))
+
+
+@lru_cache(maxsize=32)
+def _compile_stop_list(stop_list: Tuple[str, ...]) -> Tuple[re.Pattern, ...]:
+    """Compile the stop list, as one alternation when that keeps every pattern's meaning.
+
+    The fused form scans each candidate once; otherwise the patterns are searched one by one.
+    """
+    patterns = tuple(re.compile(pattern, re.IGNORECASE) for pattern in stop_list)
+    if len(patterns) < 2 or not all(_is_fusable(pattern) for pattern in stop_list):
+        return patterns
+    try:
+        return (re.compile("|".join(f"(?:{pattern})" for pattern in stop_list), re.IGNORECASE),)
+    except re.error:
+        return patterns
+
+
+@lru_cache(maxsize=32)
+def _lowered_keys(entries: Tuple[str, ...]) -> frozenset[str]:
+    return frozenset(entry.lower() for entry in entries)
 
 
 def _matches_stop_list(text: str, stop_list: Sequence[str]) -> bool:
-    for pattern in stop_list:
-        if re.search(pattern, text, flags=re.IGNORECASE):
-            return True
-    return False
+    return any(pattern.search(text) for pattern in _compile_stop_list(tuple(stop_list)))
 
 
 def _fails_repetition_quality(text: str) -> bool:
-    tokens = re.findall(r"[a-zA-Z']+", text.lower())
+    tokens = _WORDS_RE.findall(text.lower())
     token_count = len(tokens)
     if token_count < 10:
         return False
 
-    unique_ratio = len(set(tokens)) / token_count
+    counts = Counter(tokens)
+    unique_ratio = len(counts) / token_count
     if unique_ratio < 0.45:
         return True
 
-    counts: Dict[str, int] = {}
-    for tok in tokens:
-        counts[tok] = counts.get(tok, 0) + 1
-
-    spam_terms = {"noun", "verb", "phrase", "sentence", "clause", "word"}
-    spam_hits = sum(counts.get(t, 0) for t in spam_terms)
+    spam_hits = sum(counts[t] for t in _SPAM_TERMS)
     if spam_hits / token_count > 0.35:
         return True
 
@@ -113,7 +152,7 @@ def _fails_repetition_quality(text: str) -> bool:
 
 def _fails_label_spam(text: str) -> bool:
     lowered = text.lower()
-    matches = re.findall(r"\b(node|form|tense|word|pos|type)\s*[:;]", lowered)
+    matches = _LABEL_SPAM_RE.findall(lowered)
     return len(matches) >= 3
 
 
@@ -150,31 +189,87 @@ def keep_candidate(
     node_part_of_speech: str | None = None,
     node_content: str | None = None,
 ) -> bool:
+    return (
+        _normalize_kept_candidate(
+            text,
+            config,
+            node_type=node_type,
+            node_part_of_speech=node_part_of_speech,
+            node_content=node_content,
+        )
+        is not None
+    )
+
+
+def _normalize_kept_candidate(
+    text: str,
+    config: RejectedCandidateFilterConfig,
+    *,
+    node_type: str | None = None,
+    node_part_of_speech: str | None = None,
+    node_content: str | None = None,
+) -> Tuple[str, str] | None:
+    """Return (normalized text, dedupe key) for a kept candidate, None for a filtered one.
+
+    Memoized: the same rejected model outputs recur across the nodes of a document.
+    """
+    return _normalize_kept_candidate_cached(
+        text,
+        tuple(config.stop_list),
+        tuple(config.allowlist_sentence_templates),
+        tuple(config.allowlist_short_tokens),
+        config.min_len,
+        config.use_nfkc_normalization,
+        node_type,
+        node_part_of_speech,
+        node_content,
+    )
+
+
+@lru_cache(maxsize=8192)
+def _normalize_kept_candidate_cached(
+    text: str,
+    stop_list: Tuple[str, ...],
+    allowlist_sentence_templates: Tuple[str, ...],
+    allowlist_short_tokens: Tuple[str, ...],
+    min_len: int,
+    use_nfkc_normalization: bool,
+    node_type: str | None,
+    node_part_of_speech: str | None,
+    node_content: str | None,
+) -> Tuple[str, str] | None:
+    config = RejectedCandidateFilterConfig(
+        stop_list=stop_list,
+        allowlist_sentence_templates=allowlist_sentence_templates,
+        allowlist_short_tokens=allowlist_short_tokens,
+        min_len=min_len,
+        use_nfkc_normalization=use_nfkc_normalization,
+    )
     normalized = normalize_candidate_text(text, use_nfkc=config.use_nfkc_normalization)
     if not normalized:
-        return False
+        return None
 
     key = norm_key(normalized, use_nfkc=False)
-    allow_sentence_keys = {k.lower() for k in config.allowlist_sentence_templates}
-    is_allowlisted_sentence_template = bool(
-        re.match(r"^\s*sentence\s*:", normalized, flags=re.IGNORECASE) and key in allow_sentence_keys
-    )
+    # The length bound is the cheapest check, so it runs before the regex-based filters.
+    if len(normalized) < config.min_len and key not in _lowered_keys(tuple(config.allowlist_short_tokens)):
+        return None
 
-    if _matches_stop_list(normalized, config.stop_list) and not is_allowlisted_sentence_template:
-        return False
+    allow_sentence_keys = _lowered_keys(tuple(config.allowlist_sentence_templates))
+
+    if _matches_stop_list(normalized, config.stop_list) and not (
+        _has_sentence_template_prefix(normalized) and key in allow_sentence_keys
+    ):
+        return None
 
     if _fails_repetition_quality(normalized):
-        return False
+        return None
 
     if _fails_label_spam(normalized):
-        return False
+        return None
 
     if _is_sentence_like_meta(normalized):
         if key not in allow_sentence_keys:
-            return False
-
-    if len(normalized.strip()) < config.min_len and key not in {k.lower() for k in config.allowlist_short_tokens}:
-        return False
+            return None
 
     if fails_semantic_sanity(
         normalized,
@@ -182,9 +277,9 @@ def keep_candidate(
         node_part_of_speech=node_part_of_speech,
         node_content=node_content,
     ):
-        return False
+        return None
 
-    return True
+    return normalized, key
 
 
 def normalize_and_aggregate_rejected_candidates(
@@ -210,16 +305,16 @@ def normalize_and_aggregate_rejected_candidates(
     order: List[str] = []
 
     def upsert(raw_text: str, reason: str | None, count_delta: int) -> None:
-        if not keep_candidate(
+        kept = _normalize_kept_candidate(
             raw_text,
-            config=local_config,
+            local_config,
             node_type=node_type,
             node_part_of_speech=node_part_of_speech,
             node_content=node_content,
-        ):
+        )
+        if kept is None:
             return
-        normalized = normalize_candidate_text(raw_text, use_nfkc=local_config.use_nfkc_normalization)
-        key = norm_key(normalized, use_nfkc=False)
+        normalized, key = kept
         if key not in grouped:
             grouped[key] = {"text": normalized, "count": 0, "reasons": set()}
             order.append(key)
@@ -0,0 +1,536 @@
+"""Deterministic template/rule annotator for linguistic notes.
+
+Imports no torch/transformers, so `template_only` annotation does not pay for loading them.
+"""
+
+from __future__ import annotations
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterator, List, Set
+
+from ela_pipeline.annotate.fallback_notes import build_fallback_note
+from ela_pipeline.annotate.template_registry import (
+    TemplateSelection,
+    is_template_semantically_compatible,
+    render_template_note,
+    select_template_candidates,
+)
+from ela_pipeline.annotate.rejected_candidates import fails_semantic_sanity
+from ela_pipeline.validation.notes_quality import NoteAnalysis, analyze_note
+
+_WORD_RE = re.compile(r"[a-z]+")
+_TEMPLATE_PREFIX_KIND = {
+    "WORD": "morphological",
+    "SENTENCE": "syntactic",
+    "CLAUSE": "syntactic",
+    "VP": "syntactic",
+    "NP": "syntactic",
+    "PP": "syntactic",
+    "PHRASE": "syntactic",
+}
+_DETERMINISTIC_TEMPLATE_LEVELS = {"L1_EXACT", "L2_DROP_TAM"}
+
+
+@lru_cache(maxsize=4096)
+def _phrase_anchor_tokens(content_l: str) -> tuple[str, ...]:
+    """First two 4+ letter words of a phrase; a suitable phrase note mentions one of them."""
+    return tuple(t for t in _WORD_RE.findall(content_l) if len(t) >= 4)[:2]
+
+
+@dataclass(frozen=True, slots=True)
+class _NodeView:
+    """Node fields read repeatedly while annotating one node, normalized once."""
+
+    type: str
+    tense: str
+    content_l: str
+
+    @property
+    def phrase_tokens(self) -> tuple[str, ...]:
+        return _phrase_anchor_tokens(self.content_l)
+
+
+# Node fields read by template selection/rendering (template_registry) and by the note
+# suitability checks; nodes that agree on them get the same template note and verdicts.
+_TEMPLATE_SIGNATURE_FIELDS = (
+    "type",
+    "part_of_speech",
+    "dep_label",
+    "grammatical_role",
+    "mood",
+    "aspect",
+    "tense",
+    "content",
+)
+_SUITABILITY_SIGNATURE_FIELDS = ("type", "part_of_speech", "tense", "content")
+
+
+def _node_signature(node: Dict, fields: tuple[str, ...]) -> tuple:
+    return tuple(node.get(field) for field in fields)
+
+
+_TAM_FIELDS = ("tense", "aspect", "mood", "voice", "finiteness")
+_MOOD_VOICE_FINITENESS_FIELDS = ("mood", "voice", "finiteness")
+_VERBAL_WORD_POS = frozenset({"verb", "auxiliary verb"})
+_NOMINAL_PHRASE_POS = frozenset({"noun phrase", "prepositional phrase"})
+
+
+def _null_fields(node: Dict, fields: tuple[str, ...]) -> None:
+    # Fields are often "null" already (strict null normalization runs before annotation); skip those writes.
+    for field in fields:
+        if node.get(field) != "null":
+            node[field] = "null"
+
+
+class TemplateOnlyAnnotator:
+    """Rule-template notes for a contract document; LocalT5Annotator adds the model-backed modes."""
+
+    _TAM_RELEVANT_POS = frozenset({"sentence", "verb phrase", "verb", "auxiliary verb"})
+
+    def __init__(self, backoff_debug_summary: bool = False, num_workers: int = 1):
+        self.note_mode = "template_only"
+        self.backoff_debug_summary = bool(backoff_debug_summary)
+        # Sanitized/lowercased forms of notes and node contents, reused within one annotate() call.
+        self._note_analyses: Dict[str, NoteAnalysis] = {}
+        # Rule-template notes and suitability verdicts keyed by node signature, reused within
+        # one annotate() call for structurally identical nodes (repeated function words etc.).
+        self._template_notes: Dict[tuple, tuple[str, str, Dict[str, object]]] = {}
+        self._suitability: Dict[tuple, bool] = {}
+        # Sentences are independent, so they can be annotated on a thread pool.
+        self.num_workers = max(1, int(num_workers))
+
+    def _generate_template_note(
+        self, node: Dict, candidates: List[TemplateSelection] | None = None
+    ) -> tuple[str, str, Dict[str, object]]:
+        key = _node_signature(node, _TEMPLATE_SIGNATURE_FIELDS)
+        cached = self._template_notes.get(key)
+        if cached is None:
+            cached = self._template_notes[key] = self._select_template_note(node, candidates)
+        template_id, note, trace = cached
+        # The trace ends up in node["template_selection"], so each node gets its own copy.
+        trace = dict(trace)
+        if "semantic_rejects" in trace:
+            trace["semantic_rejects"] = [dict(item) for item in trace["semantic_rejects"]]
+        return template_id, note, trace
+
+    def _select_template_note(
+        self, node: Dict, candidates: List[TemplateSelection] | None = None
+    ) -> tuple[str, str, Dict[str, object]]:
+        if candidates is None:
+            candidates = select_template_candidates(node)
+        rejected_semantic = []
+        for selection in candidates:
+            template_id = (selection.template_id or "").strip()
+            if not template_id:
+                continue
+            if not is_template_semantically_compatible(node, template_id):
+                rejected_semantic.append({"template_id": template_id, "level": selection.level})
+                continue
+            note = render_template_note(template_id, node, selection.matched_key or "")
+            trace = self._trace_from_selection(
+                selection,
+                selection_mode=self._selection_mode_for_rule(selection),
+                node=node,
+            )
+            if rejected_semantic:
+                trace["semantic_rejects"] = rejected_semantic
+            # Rendered notes are usually clean already, so the caller's analysis of the result hits the memo.
+            return template_id, self._analyze_note(note).text, trace
+        fallback = candidates[-1]
+        trace = self._trace_from_selection(
+            fallback,
+            selection_mode=self._selection_mode_for_rule(fallback),
+            node=node,
+        )
+        trace["template_id"] = None
+        trace["semantic_rejects"] = rejected_semantic
+        return "", "", trace
+
+    @staticmethod
+    def _is_deterministic_selection(selection) -> bool:
+        return bool(selection and selection.template_id and selection.level in _DETERMINISTIC_TEMPLATE_LEVELS)
+
+    @staticmethod
+    def _iter_subtree(root: Dict) -> Iterator[Dict]:
+        """Yield `root` and its descendants in pre-order using an explicit stack."""
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.get("linguistic_elements", []) or []))
+
+    @staticmethod
+    def _matched_context_key(selection) -> str | None:
+        level = (selection.level or "").strip().upper()
+        if level == "L1_EXACT":
+            return selection.context_key_l1
+        if level == "L2_DROP_TAM":
+            return selection.context_key_l2
+        if level.startswith("L3"):
+            return selection.context_key_l3
+        return selection.matched_key
+
+    def _selection_mode_for_rule(self, selection) -> str:
+        level = (selection.level or "").strip().upper()
+        if level == "L1_EXACT":
+            return "rule_l1_exact"
+        if level == "L2_DROP_TAM":
+            return "rule_l2_drop_tam"
+        if level.startswith("L3"):
+            return "rule_l3_backoff"
+        return "rule_fallback"
+
+    def _selection_mode_for_model(self, selection) -> str:
+        level = (selection.level or "").strip().upper()
+        if level == "L1_EXACT":
+            return "model_l1_exact"
+        if level == "L2_DROP_TAM":
+            return "model_l2_drop_tam"
+        if level.startswith("L3"):
+            return "model_l3_backoff"
+        return "model_predicted_template"
+
+    def _is_tam_relevant_node(self, node: Dict) -> bool:
+        node_pos = str(node.get("part_of_speech") or "").strip().lower()
+        return node_pos in self._TAM_RELEVANT_POS
+
+    def _trace_from_selection(self, selection, *, selection_mode: str, node: Dict | None = None) -> Dict[str, object]:
+        trace = {
+            "level": selection.level,
+            "template_id": selection.template_id,
+            "matched_key": selection.matched_key,
+            "registry_version": selection.registry_version,
+            "context_key_l1": selection.context_key_l1,
+            "context_key_l2": selection.context_key_l2,
+            "context_key_l3": selection.context_key_l3,
+            "context_key_matched": self._matched_context_key(selection),
+            "selection_mode": selection_mode,
+        }
+        if selection.level == "L2_DROP_TAM" and node and self._is_tam_relevant_node(node):
+            trace["matched_level_reason"] = "tam_dropped"
+        return trace
+
+    def _match_selection_for_template_id(
+        self, node: Dict, template_id: str, candidates: List[TemplateSelection] | None = None
+    ) -> Dict[str, object]:
+        if candidates is None:
+            candidates = select_template_candidates(node)
+        for c in candidates:
+            if (c.template_id or "").strip() == template_id:
+                return self._trace_from_selection(
+                    c,
+                    selection_mode=self._selection_mode_for_model(c),
+                    node=node,
+                )
+        fallback = candidates[-1]
+        trace = self._trace_from_selection(
+            fallback,
+            selection_mode=self._selection_mode_for_model(fallback),
+            node=node,
+        )
+        trace["level"] = "MODEL_PREDICTED"
+        trace["template_id"] = template_id
+        return trace
+
+    def _analyze_note(self, note: str) -> NoteAnalysis:
+        """Memoized `analyze_note`; rendered template notes repeat across nodes of a document."""
+        analysis = self._note_analyses.get(note)
+        if analysis is None:
+            analysis = self._note_analyses[note] = analyze_note(note)
+        return analysis
+
+    def _node_view(self, node: Dict) -> _NodeView:
+        return _NodeView(
+            type=(node.get("type") or "").strip(),
+            tense=(node.get("tense") or "").lower(),
+            content_l=self._analyze_note(str(node.get("content", ""))).normalized,
+        )
+
+    def _is_note_suitable_for_node(
+        self,
+        node: Dict,
+        note: str,
+        *,
+        analysis: NoteAnalysis | None = None,
+        view: _NodeView | None = None,
+    ) -> bool:
+        key = (_node_signature(node, _SUITABILITY_SIGNATURE_FIELDS), note)
+        verdict = self._suitability.get(key)
+        if verdict is None:
+            verdict = self._suitability[key] = self._check_note_suitability(node, note, analysis=analysis, view=view)
+        return verdict
+
+    def _check_note_suitability(
+        self,
+        node: Dict,
+        note: str,
+        *,
+        analysis: NoteAnalysis | None = None,
+        view: _NodeView | None = None,
+    ) -> bool:
+        # Callers that already analyzed the note (or built the node view) pass it in to skip re-sanitizing.
+        if analysis is None:
+            analysis = self._analyze_note(note)
+        if not analysis.is_valid:
+            return False
+
+        if view is None:
+            view = self._node_view(node)
+        node_type = view.type
+        content = view.content_l
+        note_l = analysis.normalized
+
+        if fails_semantic_sanity(
+            note_l,
+            node_type=node.get("type"),
+            node_part_of_speech=node.get("part_of_speech"),
+            node_content=node.get("content"),
+        ):
+            return False
+
+        if node_type == "Word":
+            # Force strict lexical anchoring in quoted form to suppress generic noise.
+            if content and f"'{content}'" not in note_l:
+                return False
+            return True
+
+        if node_type == "Phrase":
+            if "phrase" not in note_l:
+                return False
+            phrase_tokens = view.phrase_tokens
+            if phrase_tokens and not any(tok in note_l for tok in phrase_tokens):
+                return False
+            return True
+
+        if node_type == "Sentence":
+            if "sentence" not in note_l:
+                return False
+            tense = view.tense
+            if tense == "past" and "present simple" in note_l:
+                return False
+            if tense == "present" and "past simple" in note_l:
+                return False
+            return True
+
+        return True
+
+    @staticmethod
+    def _normalize_tam_for_node(node: Dict) -> None:
+        node_type = str(node.get("type", "")).strip().lower()
+        pos = str(node.get("part_of_speech", "")).strip().lower()
+
+        if node_type == "word":
+            if pos not in _VERBAL_WORD_POS:
+                _null_fields(node, _TAM_FIELDS)
+            return
+
+        if node_type == "phrase":
+            if pos in _NOMINAL_PHRASE_POS:
+                _null_fields(node, _TAM_FIELDS)
+                return
+
+            # For non-verbal phrases, mood/voice/finiteness are usually not meaningful.
+            if pos != "verb phrase":
+                _null_fields(node, _MOOD_VOICE_FINITENESS_FIELDS)
+
+    @staticmethod
+    def _kind_from_template_id(template_id: str) -> str | None:
+        head, sep, _ = (template_id or "").strip().upper().partition("_")
+        return _TEMPLATE_PREFIX_KIND.get(head) if sep else None
+
+    def _infer_note_kind(
+        self,
+        node: Dict,
+        note: str,
+        template_id: str | None = None,
+        analysis: NoteAnalysis | None = None,
+    ) -> str:
+        template_kind = self._kind_from_template_id(template_id or "")
+        if template_kind:
+            return template_kind
+        return (analysis or self._analyze_note(note)).kind
+
+    def _build_typed_note(
+        self,
+        node: Dict,
+        note: str,
+        source: str,
+        template_id: str | None = None,
+        analysis: NoteAnalysis | None = None,
+    ) -> Dict[str, object]:
+        return {
+            "text": note,
+            "kind": self._infer_note_kind(node, note, template_id=template_id, analysis=analysis),
+            "confidence": 0.85 if source == "model" else 0.65,
+            "source": source,
+        }
+
+    @staticmethod
+    def _with_backoff_flag(base_flags: List[str], template_trace: Dict[str, object] | None) -> List[str]:
+        flags = list(base_flags)
+        level = str((template_trace or {}).get("level") or "").upper()
+        if level and level != "L1_EXACT" and "backoff_used" not in flags:
+            flags.append("backoff_used")
+        return flags
+
+    def annotate(self, contract_doc: Dict[str, Dict]) -> Dict[str, Dict]:
+        """Annotate every sentence tree in place."""
+        workers = min(self.num_workers, len(contract_doc))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(self._annotate_sentence_in_worker, contract_doc.items()))
+        else:
+            for sentence_text, sentence_node in contract_doc.items():
+                self._annotate_sentence(sentence_text, sentence_node)
+        self._clear_document_caches()
+        return contract_doc
+
+    def _clear_document_caches(self) -> None:
+        self._note_analyses.clear()
+        self._template_notes.clear()
+        self._suitability.clear()
+
+    def _annotate_sentence_in_worker(self, item: tuple[str, Dict]) -> None:
+        self._annotate_sentence(*item)
+
+    def _annotate_sentence(self, sentence_text: str, sentence_node: Dict) -> None:
+        seen_notes: Set[str] = set()
+        for node in self._iter_subtree(sentence_node):
+            self._annotate_node(sentence_text, node, seen_notes)
+        backoff_node_ids, backoff_leaf_node_ids, backoff_reasons, unique_spans = self._collect_backoff_summary(
+            sentence_node
+        )
+        sentence_node["backoff_nodes_count"] = len(backoff_node_ids)
+        sentence_node["backoff_leaf_nodes_count"] = len(backoff_leaf_node_ids)
+        sentence_node["backoff_aggregate_nodes_count"] = max(
+            0,
+            sentence_node["backoff_nodes_count"] - sentence_node["backoff_leaf_nodes_count"],
+        )
+        sentence_node["backoff_unique_spans_count"] = len(unique_spans)
+        if self.backoff_debug_summary:
+            sentence_node["backoff_summary"] = {
+                "nodes": backoff_node_ids,
+                "leaf_nodes": backoff_leaf_node_ids,
+                "aggregate_nodes_count": sentence_node["backoff_aggregate_nodes_count"],
+                "unique_spans": unique_spans,
+                "reasons": backoff_reasons,
+            }
+        else:
+            sentence_node.pop("backoff_summary", None)
+
+    @staticmethod
+    def _ensure_backoff_flags_consistency(node: Dict) -> None:
+        level = str(((node.get("template_selection") or {}).get("level")) or "").strip().upper()
+        if level and level != "L1_EXACT":
+            flags = node.get("quality_flags")
+            if not isinstance(flags, list):
+                flags = []
+            if "backoff_used" not in flags:
+                flags.append("backoff_used")
+            node["quality_flags"] = flags
+
+    @staticmethod
+    def _collect_backoff_summary(node: Dict) -> tuple[List[str], List[str], List[str], List[str]]:
+        """Normalize backoff flags, set `backoff_in_subtree` and collect the sentence summary.
+
+        Single iterative post-order walk: summary fields are gathered on the first
+        (pre-order) visit, `backoff_in_subtree` once all children have been visited.
+        """
+        node_ids: List[str] = []
+        leaf_node_ids: List[str] = []
+        reasons: Set[str] = set()
+        unique_span_keys: Set[str] = set()
+        subtree_backoff: Dict[int, bool] = {}
+
+        stack: List[tuple[Dict, bool]] = [(node, False)]
+        while stack:
+            cur, visited = stack.pop()
+            children = [child for child in cur.get("linguistic_elements", []) or [] if isinstance(child, dict)]
+            flags = cur.get("quality_flags") or []
+            if visited:
+                has_descendant_backoff = any([subtree_backoff[id(child)] for child in children])
+                cur["backoff_in_subtree"] = has_descendant_backoff
+                subtree_backoff[id(cur)] = "backoff_used" in flags or has_descendant_backoff
+                continue
+
+            TemplateOnlyAnnotator._ensure_backoff_flags_consistency(cur)
+            flags = cur.get("quality_flags") or []
+            if isinstance(flags, list) and "backoff_used" in flags:
+                node_id = cur.get("node_id")
+                if isinstance(node_id, str):
+                    node_ids.append(node_id)
+                    if str(cur.get("type") or "").strip() != "Sentence":
+                        leaf_node_ids.append(node_id)
+                        span = cur.get("source_span")
+                        if isinstance(span, dict):
+                            start = span.get("start")
+                            end = span.get("end")
+                            if isinstance(start, int) and isinstance(end, int):
+                                unique_span_keys.add(f"{start}:{end}")
+                reason = str((cur.get("template_selection") or {}).get("matched_level_reason") or "").strip()
+                if reason:
+                    reasons.add(reason)
+                else:
+                    reasons.add("level_backoff")
+            stack.append((cur, True))
+            stack.extend((child, False) for child in reversed(children))
+
+        return node_ids, leaf_node_ids, sorted(reasons), sorted(unique_span_keys)
+
+    def _prepare_node(self, node: Dict) -> _NodeView:
+        self._normalize_tam_for_node(node)
+        node["quality_flags"] = []
+        node["rejected_candidates"] = []
+        node["rejected_candidate_stats"] = []
+        node["reason_codes"] = []
+        return self._node_view(node)
+
+    def _annotate_node(self, sentence_text: str, node: Dict, seen_notes: Set[str]) -> None:
+        view = self._prepare_node(node)
+        self._annotate_node_from_templates(node, seen_notes, view)
+
+    def _annotate_node_from_templates(
+        self, node: Dict, seen_notes: Set[str], view: _NodeView, *, fallback: bool = True
+    ) -> bool:
+        """Apply the rule template note (or the rule fallback); False leaves `node` to the model."""
+        template_id, template_note, template_trace = self._generate_template_note(node)
+        template_analysis = self._analyze_note(template_note)
+        norm_template_note = template_analysis.normalized
+        should_dedupe = view.type != "Word"
+        template_is_new = (norm_template_note not in seen_notes) if should_dedupe else True
+        if template_note and self._is_note_suitable_for_node(node, template_note, analysis=template_analysis, view=view) and template_is_new:
+            node["linguistic_notes"] = [template_note]
+            node["notes"] = [self._build_typed_note(node, template_note, source="rule", template_id=template_id, analysis=template_analysis)]
+            node["quality_flags"] = self._with_backoff_flag(
+                ["note_generated", "rule_used", "template_selected"],
+                template_trace,
+            )
+            node["reason_codes"] = ["RULE_TEMPLATE_NOTE_ACCEPTED"]
+            node["template_selection"] = template_trace
+            if should_dedupe:
+                seen_notes.add(norm_template_note)
+            return True
+        if not fallback:
+            return False
+        fallback_note = build_fallback_note(node)
+        fallback_analysis = self._analyze_note(fallback_note)
+        fallback_norm = fallback_analysis.normalized
+        fallback_is_new = (fallback_norm not in seen_notes) if should_dedupe else True
+        if self._is_note_suitable_for_node(node, fallback_note, analysis=fallback_analysis, view=view) and fallback_is_new:
+            node["linguistic_notes"] = [fallback_note]
+            node["notes"] = [self._build_typed_note(node, fallback_note, source="rule", template_id=None, analysis=fallback_analysis)]
+            node["quality_flags"] = ["note_generated", "rule_used", "template_fallback"]
+            node["reason_codes"] = ["RULE_TEMPLATE_MISS", "RULE_TEMPLATE_FALLBACK_ACCEPTED"]
+            node["template_selection"] = template_trace
+            if should_dedupe:
+                seen_notes.add(fallback_norm)
+        else:
+            node["linguistic_notes"] = []
+            node["notes"] = []
+            node["quality_flags"] = ["no_note"]
+            node["reason_codes"] = ["RULE_TEMPLATE_MISS", "NO_VALID_NOTE"]
+            node["template_selection"] = template_trace
+        return True
@@ -5,7 +5,8 @@ from __future__ import annotations
 import hashlib
 import re
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
 
 from ela_pipeline.validation.notes_quality import sanitize_note
 
@@ -18,11 +19,21 @@ _TOKEN_RE = re.compile(r"[A-Za-z']+")
 
 
 def _norm(text: object) -> str:
+    if isinstance(text, str):
+        return _norm_str(text)
     return " ".join(str(text or "").strip().lower().split())
 
 
-def _tokens(text: str) -> List[str]:
-    return _TOKEN_RE.findall(_norm(text))
+# Node labels (type, part of speech, dep, TAM) come from a small closed set and repeat on
+# nearly every node; content strings repeat across the several key builders per node.
+@lru_cache(maxsize=4096)
+def _norm_str(text: str) -> str:
+    return " ".join(text.strip().lower().split())
+
+
+@lru_cache(maxsize=4096)
+def _tokens(text: str) -> Tuple[str, ...]:
+    return tuple(_TOKEN_RE.findall(_norm(text)))
 
 
 def _dep(node: Dict[str, object]) -> str:
@@ -82,12 +93,15 @@ def _lex_class(node: Dict[str, object]) -> str:
     return "generic"
 
 
+def _context_key_parts(node: Dict[str, object]) -> Tuple[str, str, str, str, str]:
+    return _norm(node.get("type")), _norm(node.get("part_of_speech")), _dep(node), _tam(node), _lex_class(node)
+
+
 def build_context_keys(node: Dict[str, object]) -> Dict[str, str]:
-    level = _norm(node.get("type"))
-    pos = _norm(node.get("part_of_speech"))
-    dep = _dep(node)
-    tam = _tam(node)
-    lex = _lex_class(node)
+    return _context_keys(*_context_key_parts(node))
+
+
+def _context_keys(level: str, pos: str, dep: str, tam: str, lex: str) -> Dict[str, str]:
     return {
         "l1": f"{level}|{pos}|{dep}|{tam}|{lex}",
         "l2": f"{level}|{pos}|{dep}|{lex}",
@@ -358,7 +372,7 @@ SENTENCE_MODAL_PERFECT_VARIANTS: List[str] = [
 ]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TemplateSelection:
     level: str
     template_id: Optional[str]
@@ -369,43 +383,19 @@ class TemplateSelection:
     context_key_l3: str
 
 
-def select_template(node: Dict[str, object]) -> TemplateSelection:
-    keys = build_context_keys(node)
-    if keys["l1"] in REGISTRY_L1:
-        return TemplateSelection(
-            level="L1_EXACT",
-            template_id=REGISTRY_L1[keys["l1"]],
-            matched_key=keys["l1"],
-            registry_version=REGISTRY_VERSION,
-            context_key_l1=keys["l1"],
-            context_key_l2=keys["l2"],
-            context_key_l3=keys["l3"],
-        )
-    if keys["l2"] in REGISTRY_L2:
-        return TemplateSelection(
-            level="L2_DROP_TAM",
-            template_id=REGISTRY_L2[keys["l2"]],
-            matched_key=keys["l2"],
-            registry_version=REGISTRY_VERSION,
-            context_key_l1=keys["l1"],
-            context_key_l2=keys["l2"],
-            context_key_l3=keys["l3"],
-        )
-    if keys["l3"] in REGISTRY_L3:
-        return TemplateSelection(
-            level="L3_LEVEL_POS",
-            template_id=REGISTRY_L3[keys["l3"]],
-            matched_key=keys["l3"],
-            registry_version=REGISTRY_VERSION,
-            context_key_l1=keys["l1"],
-            context_key_l2=keys["l2"],
-            context_key_l3=keys["l3"],
-        )
-    level = keys["l4"]
+# Registry levels tried in order; L4 (the bare node level) is the fallback and always matches.
+_MATCH_LEVELS = (
+    ("l1", "L1_EXACT", REGISTRY_L1),
+    ("l2", "L2_DROP_TAM", REGISTRY_L2),
+    ("l3", "L3_LEVEL_POS", REGISTRY_L3),
+)
+
+
+def _selection(level: str, template_id: Optional[str], matched_key: str, keys: Dict[str, str]) -> TemplateSelection:
     return TemplateSelection(
-        level="L4_FALLBACK",
-        template_id=REGISTRY_L4.get(level),
-        matched_key=level,
+        level=level,
+        template_id=template_id,
+        matched_key=matched_key,
         registry_version=REGISTRY_VERSION,
         context_key_l1=keys["l1"],
         context_key_l2=keys["l2"],
@@ -413,134 +403,113 @@ def select_template(node: Dict[str, object]) -> TemplateSelection:
     )
 
 
+def select_template(node: Dict[str, object]) -> TemplateSelection:
+    return _select_template_cached(*_context_key_parts(node))
+
+
 def select_template_candidates(node: Dict[str, object]) -> List[TemplateSelection]:
-    keys = build_context_keys(node)
+    return list(_select_template_candidates_cached(*_context_key_parts(node)))
+
+
+# Selection depends on the node only through its context-key parts, which take few distinct
+# values across a corpus; TemplateSelection is frozen, so cached results are shared safely.
+@lru_cache(maxsize=4096)
+def _select_template_cached(level: str, pos: str, dep: str, tam: str, lex: str) -> TemplateSelection:
+    keys = _context_keys(level, pos, dep, tam, lex)
+    for key_name, level_tag, registry in _MATCH_LEVELS:
+        template_id = registry.get(keys[key_name])
+        if template_id is not None:
+            return _selection(level_tag, template_id, keys[key_name], keys)
+    return _selection("L4_FALLBACK", REGISTRY_L4.get(keys["l4"]), keys["l4"], keys)
+
+
+@lru_cache(maxsize=4096)
+def _select_template_candidates_cached(
+    level: str, pos: str, dep: str, tam: str, lex: str
+) -> Tuple[TemplateSelection, ...]:
+    keys = _context_keys(level, pos, dep, tam, lex)
     out: List[TemplateSelection] = []
-    if keys["l1"] in REGISTRY_L1:
-        out.append(
-            TemplateSelection(
-                level="L1_EXACT",
-                template_id=REGISTRY_L1[keys["l1"]],
-                matched_key=keys["l1"],
-                registry_version=REGISTRY_VERSION,
-                context_key_l1=keys["l1"],
-                context_key_l2=keys["l2"],
-                context_key_l3=keys["l3"],
-            )
-        )
-    if keys["l2"] in REGISTRY_L2:
-        out.append(
-            TemplateSelection(
-                level="L2_DROP_TAM",
-                template_id=REGISTRY_L2[keys["l2"]],
-                matched_key=keys["l2"],
-                registry_version=REGISTRY_VERSION,
-                context_key_l1=keys["l1"],
-                context_key_l2=keys["l2"],
-                context_key_l3=keys["l3"],
-            )
-        )
-    if keys["l3"] in REGISTRY_L3:
-        out.append(
-            TemplateSelection(
-                level="L3_LEVEL_POS",
-                template_id=REGISTRY_L3[keys["l3"]],
-                matched_key=keys["l3"],
-                registry_version=REGISTRY_VERSION,
-                context_key_l1=keys["l1"],
-                context_key_l2=keys["l2"],
-                context_key_l3=keys["l3"],
-            )
-        )
-    out.append(
-        TemplateSelection(
-            level="L4_FALLBACK",
-            template_id=REGISTRY_L4.get(keys["l4"]),
-            matched_key=keys["l4"],
-            registry_version=REGISTRY_VERSION,
-            context_key_l1=keys["l1"],
-            context_key_l2=keys["l2"],
-            context_key_l3=keys["l3"],
-        )
-    )
-    uniq: List[TemplateSelection] = []
-    seen = set()
-    for item in out:
-        key = (item.level, item.template_id, item.matched_key)
-        if key in seen:
-            continue
-        seen.add(key)
-        uniq.append(item)
-    return uniq
+    for key_name, level_tag, registry in _MATCH_LEVELS:
+        template_id = registry.get(keys[key_name])
+        if template_id is not None:
+            out.append(_selection(level_tag, template_id, keys[key_name], keys))
+    out.append(_selection("L4_FALLBACK", REGISTRY_L4.get(keys["l4"]), keys["l4"], keys))
+    # Each level contributes at most one candidate, so the list never holds duplicates.
+    return tuple(out)
 
 
-def is_template_semantically_compatible(node: Dict[str, object], template_id: str) -> bool:
-    level = _norm(node.get("type"))
-    pos = _norm(node.get("part_of_speech"))
-    dep = _dep(node)
-    content = _norm(node.get("content"))
-    toks = _tokens(content)
-    first = toks[0] if toks else ""
-    tam = _tam(node)
+def _pos(node: Dict[str, object]) -> str:
+    return _norm(node.get("part_of_speech"))
 
-    if not template_id:
-        return False
 
-    if level == "sentence":
-        if template_id == "CLAUSE_SUBORDINATE_CONCESSION":
-            return first in {"although", "though", "even"}
-        if template_id == "CLAUSE_SUBORDINATE_REASON":
-            return first in {"because", "since", "as"}
-        if template_id == "CLAUSE_SUBORDINATE_TIME":
-            return first in {"before", "after", "when", "while"}
-        return template_id == "SENTENCE_FINITE_CLAUSE"
+def _tense(node: Dict[str, object]) -> str:
+    return _norm(node.get("tense"))
 
-    if level == "phrase":
-        if template_id == "PP_TIME_BEFORE_ING":
-            return "prepositional phrase" in pos and first == "before" and any(t.endswith("ing") for t in toks[1:])
-        if template_id == "PP_GENERAL_LINKING":
-            return "prepositional phrase" in pos
-        if template_id == "NP_POSSESSIVE":
-            return "noun phrase" in pos and any(t in POSSESSIVES for t in toks)
-        if template_id == "NP_DETERMINER_NOUN":
-            return "noun phrase" in pos
-        if template_id == "VP_MODAL_PERFECT":
-            return "verb phrase" in pos and tam == "modal_perfect"
-        if template_id in {"VP_AUXILIARY", "VP_PARTICIPLE"}:
-            return "verb phrase" in pos
-        return True
 
-    if level == "word":
-        if template_id == "WORD_AUX_MODAL":
-            return pos == "auxiliary verb" and first in MODAL_AUX
-        if template_id == "WORD_AUX_HAVE":
-            return pos == "auxiliary verb" and first == "have"
-        if template_id == "WORD_AUX_GENERAL":
-            return pos == "auxiliary verb"
-        if template_id == "WORD_VERB_ING":
-            tense = _norm(node.get("tense"))
-            return pos == "verb" and (first.endswith("ing") or "present participle" in tense)
-        if template_id == "WORD_VERB_PARTICIPLE":
-            tense = _norm(node.get("tense"))
-            return pos == "verb" and "participle" in tense
-        if template_id == "WORD_VERB_FINITE":
-            tense = _norm(node.get("tense"))
-            return pos == "verb" and "participle" not in tense
-        if template_id == "WORD_PRONOUN_POSSESSIVE":
-            return pos == "pronoun" and (dep == "poss" or first in POSSESSIVES)
-        if template_id == "WORD_NOUN_COMMON":
-            return pos in {"noun", "proper noun"}
-        if template_id == "WORD_ARTICLE_DEFINITE":
-            return pos in {"article", "determiner"} and first == "the"
-        if template_id == "WORD_PREPOSITION":
-            return pos == "preposition"
-        if template_id == "WORD_ADJECTIVE":
-            return pos == "adjective"
-        if template_id == "WORD_ADVERB":
-            return pos == "adverb"
-        return True
+def _content_tokens(node: Dict[str, object]) -> Tuple[str, ...]:
+    return _tokens(_norm(node.get("content")))
 
-    return True
+
+def _first_token(node: Dict[str, object]) -> str:
+    toks = _content_tokens(node)
+    return toks[0] if toks else ""
+
+
+# Per-level compatibility predicates keyed by template id. Each reads only the node fields it
+# needs; ids missing from a level fall back to that level's default verdict.
+_SENTENCE_COMPAT: Dict[str, Callable[[Dict[str, object]], bool]] = {
+    "CLAUSE_SUBORDINATE_CONCESSION": lambda n: _first_token(n) in {"although", "though", "even"},
+    "CLAUSE_SUBORDINATE_REASON": lambda n: _first_token(n) in {"because", "since", "as"},
+    "CLAUSE_SUBORDINATE_TIME": lambda n: _first_token(n) in {"before", "after", "when", "while"},
+    "SENTENCE_FINITE_CLAUSE": lambda n: True,
+}
+_PHRASE_COMPAT: Dict[str, Callable[[Dict[str, object]], bool]] = {
+    "PP_TIME_BEFORE_ING": lambda n: (
+        "prepositional phrase" in _pos(n)
+        and _first_token(n) == "before"
+        and any(t.endswith("ing") for t in _content_tokens(n)[1:])
+    ),
+    "PP_GENERAL_LINKING": lambda n: "prepositional phrase" in _pos(n),
+    "NP_POSSESSIVE": lambda n: "noun phrase" in _pos(n) and any(t in POSSESSIVES for t in _content_tokens(n)),
+    "NP_DETERMINER_NOUN": lambda n: "noun phrase" in _pos(n),
+    "VP_MODAL_PERFECT": lambda n: "verb phrase" in _pos(n) and _tam(n) == "modal_perfect",
+    "VP_AUXILIARY": lambda n: "verb phrase" in _pos(n),
+    "VP_PARTICIPLE": lambda n: "verb phrase" in _pos(n),
+}
+_WORD_COMPAT: Dict[str, Callable[[Dict[str, object]], bool]] = {
+    "WORD_AUX_MODAL": lambda n: _pos(n) == "auxiliary verb" and _first_token(n) in MODAL_AUX,
+    "WORD_AUX_HAVE": lambda n: _pos(n) == "auxiliary verb" and _first_token(n) == "have",
+    "WORD_AUX_GENERAL": lambda n: _pos(n) == "auxiliary verb",
+    "WORD_VERB_ING": lambda n: _pos(n) == "verb" and (
+        _first_token(n).endswith("ing") or "present participle" in _tense(n)
+    ),
+    "WORD_VERB_PARTICIPLE": lambda n: _pos(n) == "verb" and "participle" in _tense(n),
+    "WORD_VERB_FINITE": lambda n: _pos(n) == "verb" and "participle" not in _tense(n),
+    "WORD_PRONOUN_POSSESSIVE": lambda n: _pos(n) == "pronoun" and (
+        _dep(n) == "poss" or _first_token(n) in POSSESSIVES
+    ),
+    "WORD_NOUN_COMMON": lambda n: _pos(n) in {"noun", "proper noun"},
+    "WORD_ARTICLE_DEFINITE": lambda n: _pos(n) in {"article", "determiner"} and _first_token(n) == "the",
+    "WORD_PREPOSITION": lambda n: _pos(n) == "preposition",
+    "WORD_ADJECTIVE": lambda n: _pos(n) == "adjective",
+    "WORD_ADVERB": lambda n: _pos(n) == "adverb",
+}
+_COMPAT_BY_LEVEL = {
+    "sentence": (_SENTENCE_COMPAT, False),
+    "phrase": (_PHRASE_COMPAT, True),
+    "word": (_WORD_COMPAT, True),
+}
+
+
+def is_template_semantically_compatible(node: Dict[str, object], template_id: str) -> bool:
+    if not template_id:
+        return False
+    level_compat = _COMPAT_BY_LEVEL.get(_norm(node.get("type")))
+    if level_compat is None:
+        return True
+    predicates, default = level_compat
+    predicate = predicates.get(template_id)
+    return default if predicate is None else predicate(node)
 
 
 def _variant_index(template_id: str, content: str, matched_key: str, modulo: int) -> int:
@@ -550,14 +519,21 @@ def _variant_index(template_id: str, content: str, matched_key: str, modulo: int
 
 
 def render_template_note(template_id: str, node: Dict[str, object], matched_key: str) -> str:
-    if template_id == "SENTENCE_FINITE_CLAUSE" and _tam(node) == "modal_perfect":
-        idx = _variant_index(template_id, str(node.get("content", "")), matched_key or "", len(SENTENCE_MODAL_PERFECT_VARIANTS))
+    modal_perfect = template_id == "SENTENCE_FINITE_CLAUSE" and _tam(node) == "modal_perfect"
+    return _render_template_note_cached(template_id, str(node.get("content", "")), matched_key or "", modal_perfect)
+
+
+@lru_cache(maxsize=4096)
+def _render_template_note_cached(template_id: str, content: str, matched_key: str, modal_perfect: bool) -> str:
+    # Pure in its arguments: the variant index is a hash of (template_id, content, matched_key).
+    if modal_perfect:
+        idx = _variant_index(template_id, content, matched_key, len(SENTENCE_MODAL_PERFECT_VARIANTS))
         return sanitize_note(SENTENCE_MODAL_PERFECT_VARIANTS[idx])
     variants = TEMPLATE_VARIANTS.get(template_id) or []
     if not variants:
         return ""
-    content = str(node.get("content", "")).strip()
-    idx = _variant_index(template_id, content, matched_key or "", len(variants))
+    content = content.strip()
+    idx = _variant_index(template_id, content, matched_key, len(variants))
     raw = variants[idx].format(content=content)
     return sanitize_note(raw)
 
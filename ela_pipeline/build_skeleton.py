@@ -6,7 +6,7 @@ import argparse
 import json
 
 from ela_pipeline.parse.spacy_parser import load_nlp
-from ela_pipeline.skeleton.builder import build_skeleton
+from ela_pipeline.skeleton.builder import build_skeleton_from_doc
 from ela_pipeline.validation.validator import raise_if_invalid, validate_contract
 
 
@@ -15,28 +15,26 @@ def main() -> None:
     parser.add_argument("--input", required=True, help="Input JSONL with field 'text'")
     parser.add_argument("--output", required=True)
     parser.add_argument("--spacy-model", default="en_core_web_sm")
+    parser.add_argument("--batch-size", type=int, default=64, help="Texts per spaCy nlp.pipe batch")
+    parser.add_argument(
+        "--n-process", type=int, default=1, help="spaCy parser worker processes (each loads its own model copy)"
+    )
     args = parser.parse_args()
 
     nlp = load_nlp(args.spacy_model)
 
-    rows = []
-    with open(args.input, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                rows.append(json.loads(line))
-
-    docs = []
-    for row in rows:
-        contract_doc = build_skeleton(row["text"], nlp)
-        raise_if_invalid(validate_contract(contract_doc))
-        docs.append(contract_doc)
-
-    with open(args.output, "w", encoding="utf-8") as f:
-        for doc in docs:
-            f.write(json.dumps(doc, ensure_ascii=False) + "\n")
-
-    print(f"Saved {len(docs)} documents to {args.output}")
+    # Texts are parsed in nlp.pipe batches but still read, validated and written one document
+    # at a time, so memory stays at one batch and output appears as the corpus is processed.
+    count = 0
+    with open(args.input, "r", encoding="utf-8") as fin, open(args.output, "w", encoding="utf-8") as fout:
+        texts = (json.loads(line)["text"] for line in map(str.strip, fin) if line)
+        for doc in nlp.pipe(texts, batch_size=max(1, args.batch_size), n_process=max(1, args.n_process)):
+            contract_doc = build_skeleton_from_doc(doc)
+            raise_if_invalid(validate_contract(contract_doc))
+            fout.write(json.dumps(contract_doc, ensure_ascii=False) + "\n")
+            count += 1
+
+    print(f"Saved {count} documents to {args.output}")
 
 
 if __name__ == "__main__":
@@ -140,7 +140,7 @@ class T5CEFRPredictor:
             raise FileNotFoundError(f"CEFR model directory not found: {path}")
         try:
             import torch
-            from transformers import T5ForConditionalGeneration, T5Tokenizer
+            from transformers import T5ForConditionalGeneration, T5Tokenizer, T5TokenizerFast
         except Exception as exc:  # pragma: no cover - env dependent
             raise ImportError("transformers + torch are required for t5 CEFR provider") from exc
 
@@ -151,7 +151,10 @@ class T5CEFRPredictor:
             raise RuntimeError("GPU-only policy: CUDA is required for CEFR T5 inference")
 
         self._torch = torch
-        self._tokenizer = T5Tokenizer.from_pretrained(path)
+        try:
+            self._tokenizer = T5TokenizerFast.from_pretrained(path)
+        except (OSError, ValueError):
+            self._tokenizer = T5Tokenizer.from_pretrained(path)
         self._model = T5ForConditionalGeneration.from_pretrained(path).to(resolved_device)
         self._model.eval()
         self.device = resolved_device
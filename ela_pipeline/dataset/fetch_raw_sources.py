@@ -40,7 +40,7 @@ def _looks_sentence(s: str) -> bool:
     s = s.strip()
     if len(s) < 8 or len(s) > 260:
         return False
-    alpha = sum(ch.isalpha() for ch in s)
+    alpha = sum(map(str.isalpha, s))
     return alpha >= 4
 
 
@@ -584,6 +584,7 @@ def run_pipeline(
     cefr_provider: str = "rule",
     cefr_model_path: str = DEFAULT_CEFR_MODEL_PATH,
     cefr_nodes: bool = True,
+    model_use_bf16: bool = True,
 ) -> dict:
     nlp = load_nlp(spacy_model)
 
@@ -595,13 +596,19 @@ def run_pipeline(
     apply_tam(enriched, nlp)
     _apply_strict_null_normalization(enriched, validation_mode)
 
-    if model_dir:
+    if model_dir and (note_mode or "template_only").strip().lower() == "template_only":
+        # Rule templates only: skip importing torch/transformers and loading the model.
+        from ela_pipeline.annotate.template_annotator import TemplateOnlyAnnotator
+
+        TemplateOnlyAnnotator(backoff_debug_summary=backoff_debug_summary).annotate(enriched)
+    elif model_dir:
         from ela_pipeline.annotate.local_generator import LocalT5Annotator
 
         annotator = LocalT5Annotator(
             model_dir=model_dir,
             note_mode=note_mode,
             backoff_debug_summary=backoff_debug_summary,
+            use_bf16=model_use_bf16,
         )
         annotator.annotate(enriched)
 
@@ -694,6 +701,11 @@ def main() -> None:
         action="store_true",
         help="Attach sentence-level backoff_summary with node ids/reasons for debugging.",
     )
+    parser.add_argument(
+        "--no-bf16",
+        action="store_true",
+        help="Run the T5 annotator in FP32 even on GPUs with BF16 support (BF16 notes can differ slightly).",
+    )
     parser.add_argument("--translate", action="store_true", help="Enable multilingual translation enrichment.")
     parser.add_argument(
         "--translation-provider",
@@ -857,6 +869,7 @@ def main() -> None:
         cefr_provider=args.cefr_provider,
         cefr_model_path=args.cefr_model_path,
         cefr_nodes=not args.no_cefr_nodes,
+        model_use_bf16=not args.no_bf16,
     )
 
     out_path = args.output
@@ -11,7 +11,7 @@ from typing import Any, Callable
 
 from ela_pipeline.client_storage import build_sentence_hash
 from ela_pipeline.cefr import RuleBasedCEFRPredictor
-from ela_pipeline.annotate.local_generator import LocalT5Annotator
+from ela_pipeline.annotate.template_annotator import TemplateOnlyAnnotator
 from ela_pipeline.parse.spacy_parser import load_nlp
 from ela_pipeline.phonetic import EspeakPhoneticTranscriber
 from ela_pipeline.skeleton.builder import build_skeleton
@@ -345,7 +345,7 @@ def _enrich_analyzed_contract(
     provider_credentials: dict[str, str] | None = None,
 ) -> None:
     # Notes: deterministic template/rule mode, no model dependency required.
-    annotator = LocalT5Annotator(model_dir=".", note_mode="template_only")
+    annotator = TemplateOnlyAnnotator()
     annotator.annotate(analyzed)
 
     # CEFR: deterministic rule predictor for stable runtime behavior.
@@ -298,7 +298,11 @@ def _mark_ref_duplicates(sentence_node: Dict) -> None:
 
 
 def build_skeleton(text: str, nlp) -> Dict[str, Dict]:
-    doc = nlp(text)
+    return build_skeleton_from_doc(nlp(text))
+
+
+def build_skeleton_from_doc(doc) -> Dict[str, Dict]:
+    """Build the contract skeleton from an already parsed spaCy `Doc` (e.g. from `nlp.pipe`)."""
     output: Dict[str, Dict] = {}
     seq = 0
 
@@ -5,7 +5,8 @@ from __future__ import annotations
 import json
 import os
 import re
-from functools import lru_cache
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from typing import List
 
 _BAD_PATTERNS = [
@@ -34,6 +35,8 @@ _GENERIC_TEMPLATE_PATTERNS = [
     re.compile(r"\bsensation posed\b", re.IGNORECASE),
 ]
 
+_WORDS_RE = re.compile(r"[a-zA-Z']+")
+
 _LEADING_BAD_PREFIX_PATTERNS = [
     re.compile(r"^\s*sentence\b", re.IGNORECASE),
     re.compile(r"^\s*senten[cs]e\b", re.IGNORECASE),
@@ -41,6 +44,17 @@ _LEADING_BAD_PREFIX_PATTERNS = [
     re.compile(r"^\s*sensibilis(a|z)tion\b", re.IGNORECASE),
 ]
 
+
+def _fuse_patterns(patterns: List[re.Pattern]) -> re.Pattern:
+    """Combine patterns into one case-insensitive alternation so a note is scanned once per list."""
+    return re.compile("|".join(f"(?:{p.pattern})" for p in patterns), re.IGNORECASE)
+
+
+# `^[\W_]+$` is the only pattern compiled without IGNORECASE; case folding does not change what it matches.
+_BAD_RE = _fuse_patterns(_BAD_PATTERNS)
+_GENERIC_TEMPLATE_RE = _fuse_patterns(_GENERIC_TEMPLATE_PATTERNS)
+_LEADING_BAD_PREFIX_RE = _fuse_patterns(_LEADING_BAD_PREFIX_PATTERNS)
+
 _NOISE_TOKENS = {
     "node",
     "content",
@@ -53,6 +67,13 @@ _NOISE_TOKENS = {
     "null",
 }
 
+_MORPH_MARKERS = ("tense", "aspect", "voice", "mood", "verb form", "plural", "singular")
+_SYN_MARKERS = ("subject", "predicate", "object", "clause", "phrase", "sentence", "agreement")
+_DISC_MARKERS = ("topic", "context", "cohesion", "register", "emphasis")
+_MORPH_MARKER_RE = re.compile("|".join(map(re.escape, _MORPH_MARKERS)))
+_SYN_MARKER_RE = re.compile("|".join(map(re.escape, _SYN_MARKERS)))
+_DISC_MARKER_RE = re.compile("|".join(map(re.escape, _DISC_MARKERS)))
+
 DEFAULT_HARD_NEGATIVE_PATTERNS_PATH = "artifacts/quality/hard_negative_patterns.json"
 
 
@@ -86,10 +107,9 @@ def _load_external_patterns(path: str) -> List[re.Pattern]:
                 if text:
                     phrases.append(text)
 
-    compiled = []
-    for phrase in phrases:
-        compiled.append(re.compile(re.escape(phrase), re.IGNORECASE))
-    return compiled
+    if not phrases:
+        return []
+    return [re.compile("|".join(map(re.escape, phrases)), re.IGNORECASE)]
 
 
 def _get_external_patterns() -> List[re.Pattern]:
@@ -102,39 +122,76 @@ def sanitize_note(note: str) -> str:
 
 
 def is_generic_template(note: str) -> bool:
-    text = sanitize_note(note)
-    for pattern in _GENERIC_TEMPLATE_PATTERNS + _get_external_patterns():
+    return _is_generic_sanitized(sanitize_note(note))
+
+
+def _is_generic_sanitized(text: str) -> bool:
+    if _GENERIC_TEMPLATE_RE.search(text):
+        return True
+    for pattern in _get_external_patterns():
         if pattern.search(text):
             return True
     return False
 
 
 def is_valid_note(note: str) -> bool:
-    text = sanitize_note(note)
+    return _is_valid_sanitized(sanitize_note(note))
+
+
+def _is_valid_sanitized(text: str) -> bool:
     if not text:
         return False
 
-    for pattern in _LEADING_BAD_PREFIX_PATTERNS:
-        if pattern.search(text):
-            return False
+    if _LEADING_BAD_PREFIX_RE.search(text):
+        return False
 
     if len(text) < 12:
         return False
 
-    words = re.findall(r"[a-zA-Z']+", text.lower())
+    words = _WORDS_RE.findall(text.lower())
     if len(words) < 6:
         return False
 
-    for pattern in _BAD_PATTERNS:
-        if pattern.search(text):
-            return False
+    if _BAD_RE.search(text):
+        return False
 
     if words:
         noise_count = sum(1 for w in words if w in _NOISE_TOKENS)
         if (noise_count / len(words)) > 0.30:
             return False
 
-    if is_generic_template(text):
+    if _is_generic_sanitized(text):
         return False
 
     return True
+
+
+def _kind_from_markers(note_l: str) -> str:
+    if _MORPH_MARKER_RE.search(note_l):
+        return "morphological"
+    if _SYN_MARKER_RE.search(note_l):
+        return "syntactic"
+    if _DISC_MARKER_RE.search(note_l):
+        return "discourse"
+    return "semantic"
+
+
+@dataclass
+class NoteAnalysis:
+    """Sanitized forms of one note; validity and marker kind are computed on first access."""
+
+    text: str
+    normalized: str
+
+    @cached_property
+    def is_valid(self) -> bool:
+        return _is_valid_sanitized(self.text)
+
+    @cached_property
+    def kind(self) -> str:
+        return _kind_from_markers(self.normalized)
+
+
+def analyze_note(note: str) -> NoteAnalysis:
+    text = sanitize_note(note)
+    return NoteAnalysis(text=text, normalized=text.lower())
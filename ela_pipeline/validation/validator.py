@@ -798,20 +798,47 @@ def validate_contract(doc: Dict[str, Any], validation_mode: str = "v2_strict") -
     return ValidationResult(ok=not errors, errors=errors)
 
 
+def validate_annotation_fields(doc: Dict[str, Any]) -> ValidationResult:
+    """Check only the fields an annotator writes, assuming structure was verified frozen."""
+    errors: List[ValidationErrorItem] = []
+    stack = [(sentence_node, f"$.{sentence_key}") for sentence_key, sentence_node in reversed(list(doc.items()))]
+    while stack:
+        node, path = stack.pop()
+        notes = node.get("linguistic_notes")
+        _expect(isinstance(notes, list), errors, f"{path}.linguistic_notes", "linguistic_notes must be list")
+        if isinstance(notes, list):
+            for idx, note in enumerate(notes):
+                _expect(isinstance(note, str), errors, f"{path}.linguistic_notes[{idx}]", "note must be string")
+        _validate_optional_notes(node, path, errors)
+        _validate_optional_trace_fields(node, path, errors)
+        _validate_optional_template_selection(node, path, errors)
+        _validate_optional_backoff_in_subtree(node, path, errors)
+        _validate_optional_backoff_summary(node, path, errors)
+        _validate_optional_rejected_candidate_stats(node, path, errors)
+        children = node.get("linguistic_elements") or []
+        stack.extend(
+            (child, f"{path}.linguistic_elements[{idx}]") for idx, child in reversed(list(enumerate(children)))
+        )
+    return ValidationResult(ok=not errors, errors=errors)
+
+
+FROZEN_FIELDS = (
+    "type",
+    "content",
+    "part_of_speech",
+    "node_id",
+    "parent_id",
+    "source_span",
+    "grammatical_role",
+    "dep_label",
+    "head_id",
+    "features",
+    "schema_version",
+)
+
+
 def _freeze_compare(base: Dict[str, Any], candidate: Dict[str, Any], path: str, errors: List[ValidationErrorItem]) -> None:
-    for field in (
-        "type",
-        "content",
-        "part_of_speech",
-        "node_id",
-        "parent_id",
-        "source_span",
-        "grammatical_role",
-        "dep_label",
-        "head_id",
-        "features",
-        "schema_version",
-    ):
+    for field in FROZEN_FIELDS:
         if base.get(field) != candidate.get(field):
             errors.append(ValidationErrorItem(path=f"{path}.{field}", message="Frozen field mismatch"))
 
@@ -825,6 +852,56 @@ def _freeze_compare(base: Dict[str, Any], candidate: Dict[str, Any], path: str,
         _freeze_compare(base_child, cand_child, f"{path}.linguistic_elements[{idx}]", errors)
 
 
+def _immutable(value: Any) -> Any:
+    if isinstance(value, dict):
+        return frozenset((key, _immutable(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(_immutable(item) for item in value)
+    return value
+
+
+def _node_signature(node: Dict[str, Any]) -> tuple:
+    fields = tuple(_immutable(node.get(field)) for field in FROZEN_FIELDS)
+    children = tuple(_node_signature(child) for child in node.get("linguistic_elements", []))
+    return fields, children
+
+
+def frozen_shape_signature(doc: Dict[str, Any]) -> Dict[str, tuple]:
+    """Capture the frozen fields of every node as nested tuples.
+
+    A lighter alternative to keeping a deep-copied skeleton around for `validate_frozen_structure`.
+    """
+    return {key: _node_signature(node) for key, node in doc.items()}
+
+
+def _signature_compare(base: tuple, candidate: Dict[str, Any], path: str, errors: List[ValidationErrorItem]) -> None:
+    base_fields, base_children = base
+    for field, base_value in zip(FROZEN_FIELDS, base_fields):
+        if base_value != _immutable(candidate.get(field)):
+            errors.append(ValidationErrorItem(path=f"{path}.{field}", message="Frozen field mismatch"))
+
+    cand_children = candidate.get("linguistic_elements", [])
+    if len(base_children) != len(cand_children):
+        errors.append(ValidationErrorItem(path=f"{path}.linguistic_elements", message="Children count mismatch"))
+        return
+
+    for idx, (base_child, cand_child) in enumerate(zip(base_children, cand_children)):
+        _signature_compare(base_child, cand_child, f"{path}.linguistic_elements[{idx}]", errors)
+
+
+def validate_frozen_signature(signature: Dict[str, tuple], enriched: Dict[str, Any]) -> ValidationResult:
+    errors: List[ValidationErrorItem] = []
+
+    if set(signature.keys()) != set(enriched.keys()):
+        errors.append(ValidationErrorItem(path="$", message="Top-level sentence keys mismatch"))
+        return ValidationResult(ok=False, errors=errors)
+
+    for key, node_signature in signature.items():
+        _signature_compare(node_signature, enriched[key], f"$.{key}", errors)
+
+    return ValidationResult(ok=not errors, errors=errors)
+
+
 def validate_frozen_structure(skeleton: Dict[str, Any], enriched: Dict[str, Any]) -> ValidationResult:
     errors: List[ValidationErrorItem] = []
 
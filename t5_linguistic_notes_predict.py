@@ -10,6 +10,7 @@ Windows / CPU-friendly.
 """
 
 import os
+import shutil
 import sys
 from typing import List, Dict, Any
 
@@ -32,6 +33,85 @@ MAX_TARGET_LENGTH = 128
 # You trained on CPU; inference on CPU is fine (and stable).
 device = torch.device("cpu")
 
+# Dynamic int8 quantization of nn.Linear layers (CPU only); with the ONNX backend the
+# exported graphs are quantized once into MODEL_DIR/onnx-int8. Set to "0" to compare
+# against the plain FP32 model.
+QUANTIZE_INT8 = os.getenv("T5_QUANTIZE_INT8", "1") != "0"
+
+# Opt-in BF16 autocast for the PyTorch backend on CPUs with native BF16 (AVX512-BF16 / AMX);
+# it replaces int8 quantization. Older CPUs emulate BF16 and get slower, hence off by default.
+USE_BF16 = os.getenv("T5_BF16", "0") == "1"
+
+# ONNX Runtime backend: "auto" uses MODEL_DIR/onnx when it exists, "1" also exports
+# it on first run (needs `optimum[onnxruntime]`), "0" always uses PyTorch.
+ONNX_DIR = os.path.join(MODEL_DIR, "onnx")
+ONNX_INT8_DIR = os.path.join(MODEL_DIR, "onnx-int8")
+USE_ONNX = os.getenv("T5_ONNX", "auto").strip().lower()
+
+# Optional assisted generation (PyTorch backend only): a smaller T5 checkpoint fine-tuned on
+# the same data and sharing the tokenizer drafts tokens that the main model verifies.
+# Greedy output is unchanged; it only pays off when the draft model agrees often.
+ASSISTANT_MODEL_DIR = os.getenv("T5_ASSISTANT_MODEL_DIR", "").strip()
+
+
+def quantize_onnx_dir(src_dir: str, dst_dir: str) -> None:
+    """Copy an ONNX export, storing every encoder/decoder graph with int8 dynamic weights."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    shutil.copytree(src_dir, dst_dir, ignore=shutil.ignore_patterns("*.onnx"), dirs_exist_ok=True)
+    for name in sorted(os.listdir(src_dir)):
+        if name.endswith(".onnx"):
+            quantize_dynamic(
+                os.path.join(src_dir, name),
+                os.path.join(dst_dir, name),
+                weight_type=QuantType.QInt8,
+            )
+
+
+def load_onnx_model():
+    """Load (or export once) the ONNX encoder/decoder and run it on the CPU execution provider."""
+    try:
+        import onnxruntime as ort
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except Exception as exc:
+        raise RuntimeError("ONNX Runtime inference requires `optimum[onnxruntime]` package.") from exc
+
+    sess_options = ort.SessionOptions()
+    sess_options.intra_op_num_threads = os.cpu_count() or 1
+    sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+    if not os.path.isdir(ONNX_DIR):
+        model = ORTModelForSeq2SeqLM.from_pretrained(
+            MODEL_DIR, export=True, provider="CPUExecutionProvider", session_options=sess_options
+        )
+        model.save_pretrained(ONNX_DIR)
+        if not QUANTIZE_INT8:
+            return model
+    if QUANTIZE_INT8 and not os.path.isdir(ONNX_INT8_DIR):
+        quantize_onnx_dir(ONNX_DIR, ONNX_INT8_DIR)
+    return ORTModelForSeq2SeqLM.from_pretrained(
+        ONNX_INT8_DIR if QUANTIZE_INT8 else ONNX_DIR,
+        provider="CPUExecutionProvider",
+        session_options=sess_options,
+    )
+
+
+def load_assistant_model(model):
+    """Load the draft model for assisted generation, or return None when it is not configured."""
+    if not ASSISTANT_MODEL_DIR or not isinstance(model, torch.nn.Module):
+        return None
+    try:
+        assistant = T5ForConditionalGeneration.from_pretrained(ASSISTANT_MODEL_DIR)
+        assistant.to(device)
+        assistant.eval()
+        if QUANTIZE_INT8 and not USE_BF16:
+            assistant = torch.ao.quantization.quantize_dynamic(assistant, {torch.nn.Linear}, dtype=torch.qint8)
+    except Exception as e:
+        print(f"❌ Error while loading assistant T5 model from {ASSISTANT_MODEL_DIR}: {e}")
+        sys.exit(1)
+    print(f"✅ assistant model loaded from {ASSISTANT_MODEL_DIR}")
+    return assistant
+
 
 def load_models():
     """Load fine-tuned T5 model, tokenizer and spaCy pipeline."""
@@ -42,11 +122,17 @@ def load_models():
         )
         sys.exit(1)
 
+    use_onnx = USE_ONNX == "1" or (USE_ONNX == "auto" and os.path.isdir(ONNX_DIR))
     try:
         tokenizer = T5Tokenizer.from_pretrained(MODEL_DIR)
-        model = T5ForConditionalGeneration.from_pretrained(MODEL_DIR)
-        model.to(device)
-        model.eval()
+        if use_onnx:
+            model = load_onnx_model()
+        else:
+            model = T5ForConditionalGeneration.from_pretrained(MODEL_DIR)
+            model.to(device)
+            model.eval()
+            if QUANTIZE_INT8 and not USE_BF16:
+                model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
     except Exception as e:
         print(f"❌ Error while loading T5 model from {MODEL_DIR}: {e}")
         sys.exit(1)
@@ -65,6 +151,10 @@ def load_models():
     print(f"✅ T5 model loaded from {MODEL_DIR}")
     print(f"✅ spaCy model '{SPACY_MODEL}' loaded")
     print(f"✅ device = {device}")
+    print(f"✅ backend = {'onnxruntime' if use_onnx else 'pytorch'}")
+    print(f"✅ int8 dynamic quantization = {'on' if QUANTIZE_INT8 and (use_onnx or not USE_BF16) else 'off'}")
+    if not use_onnx:
+        print(f"✅ bf16 autocast = {'on' if USE_BF16 else 'off'}")
     return tokenizer, model, nlp
 
 
@@ -151,6 +241,7 @@ def generate_linguistic_notes(
     tokenizer: T5Tokenizer,
     model: T5ForConditionalGeneration,
     max_target_length: int = MAX_TARGET_LENGTH,
+    assistant_model: T5ForConditionalGeneration | None = None,
 ) -> str:
     enc = tokenizer(
         llm_input,
@@ -160,11 +251,17 @@ def generate_linguistic_notes(
     )
     enc = {k: v.to(device) for k, v in enc.items()}
 
-    with torch.no_grad():
+    bf16 = USE_BF16 and isinstance(model, torch.nn.Module)
+    extra = {"assistant_model": assistant_model} if assistant_model is not None else {}
+    with torch.no_grad(), torch.autocast("cpu", dtype=torch.bfloat16, enabled=bf16):
         output_ids = model.generate(
             **enc,
             max_length=max_target_length,
             num_beams=1,
+            use_cache=True,
+            eos_token_id=tokenizer.eos_token_id,
+            pad_token_id=tokenizer.pad_token_id,
+            **extra,
         )
 
     return tokenizer.decode(output_ids[0], skip_special_tokens=True)
@@ -176,6 +273,7 @@ def analyse_text(
     model: T5ForConditionalGeneration,
     nlp,
     max_items: int = 20,
+    assistant_model: T5ForConditionalGeneration | None = None,
 ) -> List[Dict[str, Any]]:
     print(f"\n⚙️ Analysing text with length {len(text)} characters...\n")
 
@@ -187,7 +285,7 @@ def analyse_text(
     results: List[Dict[str, Any]] = []
 
     for idx, ex in enumerate(examples):
-        notes = generate_linguistic_notes(ex["llm_input"], tokenizer, model)
+        notes = generate_linguistic_notes(ex["llm_input"], tokenizer, model, assistant_model=assistant_model)
         result_item = {
             "level": ex["level"],
             "original": ex["original"],
@@ -215,13 +313,14 @@ def analyse_text(
 
 if __name__ == "__main__":
     tokenizer, model, nlp = load_models()
+    assistant_model = load_assistant_model(model)
 
     if len(sys.argv) > 1:
         input_text = " ".join(sys.argv[1:])
     else:
         input_text = "I like to eat pizza."
 
-    results = analyse_text(input_text, tokenizer, model, nlp)
+    results = analyse_text(input_text, tokenizer, model, nlp, assistant_model=assistant_model)
 
     # Save to JSON if you want
     # import json
@@ -1,6 +1,7 @@
+import json
 import unittest
 
-from ela_pipeline.adapters import adapt_legacy_contract_doc
+from ela_pipeline.adapters import adapt_legacy_contract_bytes, adapt_legacy_contract_doc
 
 
 class LegacyContractAdapterTests(unittest.TestCase):
@@ -61,6 +62,63 @@ class LegacyContractAdapterTests(unittest.TestCase):
         self.assertEqual(sent["linguistic_elements"], [])
         self.assertEqual(sent["schema_version"], "v2")
 
+    def test_does_not_mutate_input_tree(self):
+        word = {
+            "type": "Word",
+            "content": "Hello",
+            "tense": "null",
+            "features": {"number": "singular"},
+            "linguistic_elements": [],
+        }
+        legacy = {
+            "Hello.": {
+                "type": "Sentence",
+                "content": "Hello.",
+                "tense": "null",
+                "linguistic_notes": ["A greeting."],
+                "source_span": {"start": 0, "end": 6},
+                "linguistic_elements": [word],
+            }
+        }
+        adapted = adapt_legacy_contract_doc(legacy)
+        adapted_word = adapted["Hello."]["linguistic_elements"][0]
+
+        self.assertIsNot(adapted_word, word)
+        self.assertIsNone(adapted_word["tense"])
+        self.assertEqual(word["tense"], "null")
+        self.assertNotIn("schema_version", word)
+        self.assertIs(legacy["Hello."]["linguistic_elements"][0], word)
+        sentence = adapted["Hello."]
+        self.assertEqual(sentence["linguistic_notes"], ["A greeting."])
+        self.assertIsNot(sentence["linguistic_notes"], legacy["Hello."]["linguistic_notes"])
+        self.assertIsNot(sentence["source_span"], legacy["Hello."]["source_span"])
+        self.assertEqual(adapted_word["features"], {"number": "singular"})
+        self.assertIsNot(adapted_word["features"], word["features"])
+
+    def test_adapts_raw_json_payload(self):
+        legacy = {"Hi.": {"type": "Sentence", "content": "Hi.", "tense": "null", "sentence_cefr": "A1"}}
+        raw = json.dumps(legacy, ensure_ascii=False)
+
+        adapted = adapt_legacy_contract_bytes(raw.encode("utf-8"))
+        self.assertEqual(adapted, adapt_legacy_contract_doc(legacy))
+        self.assertEqual(adapt_legacy_contract_bytes(raw), adapted)
+        self.assertEqual(adapt_legacy_contract_bytes(b"[]"), {})
+
+    def test_adapts_trees_deeper_than_recursion_limit(self):
+        node = {"type": "Word", "content": "deep", "linguistic_elements": []}
+        for _ in range(3000):
+            node = {"type": "Phrase", "content": "deep", "tense": "null", "linguistic_elements": [node]}
+        adapted = adapt_legacy_contract_doc({"Deep.": {"type": "Sentence", "content": "Deep.", "linguistic_elements": [node]}})
+
+        depth = 0
+        cur = adapted["Deep."]
+        while cur["linguistic_elements"]:
+            cur = cur["linguistic_elements"][0]
+            depth += 1
+        self.assertEqual(depth, 3001)
+        self.assertEqual(cur["content"], "deep")
+        self.assertEqual(cur["schema_version"], "v2")
+
 
 if __name__ == "__main__":
     unittest.main()
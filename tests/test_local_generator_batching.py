@@ -0,0 +1,320 @@
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import torch
+from transformers.modeling_outputs import BaseModelOutput
+
+from ela_pipeline.annotate.local_generator import LocalT5Annotator
+from ela_pipeline.annotate.template_registry import all_template_ids
+
+
+class FakeTokenizer:
+    pad_token_id = 0
+    eos_token_id = 1
+
+    def __init__(self):
+        self.prompts: list[str] = []
+
+    def __call__(self, text, return_tensors=None, truncation=True, max_length=None, padding=False, **kwargs):
+        texts = [text] if isinstance(text, str) else list(text)
+        ids = []
+        for prompt in texts:
+            self.prompts.append(prompt)
+            ids.append([len(self.prompts) + 1, self.eos_token_id])
+        return {"input_ids": torch.tensor(ids), "attention_mask": torch.ones(len(ids), 2, dtype=torch.long)}
+
+    def tokenize(self, text):
+        return text.split("_")
+
+    def _note(self, token_id: int) -> str:
+        prompt = self.prompts[token_id - 2]
+        content = prompt.rsplit("Node content: ", 1)[-1]
+        return f"The unit '{content.lower()}' has a clear grammatical function in this phrase and sentence."
+
+    def decode(self, ids, skip_special_tokens=True):
+        if int(ids[0]) == self.pad_token_id:
+            return "ok"
+        return self._note(int(ids[0]))
+
+    def batch_decode(self, sequences, skip_special_tokens=True):
+        return [self.decode(seq) for seq in sequences]
+
+
+class FakeEncoder:
+    def __init__(self, model: "FakeModel"):
+        self.model = model
+
+    def __call__(self, **kwargs):
+        return self.forward(**kwargs)
+
+    def forward(self, input_ids=None, attention_mask=None, return_dict=True):
+        self.model.encoded_rows += int(input_ids.shape[0])
+        return BaseModelOutput(last_hidden_state=input_ids.float().unsqueeze(-1))
+
+
+class FakeModel:
+    def __init__(self, greedy_is_noise: bool = False):
+        self.batch_sizes: list[int] = []
+        self.sampled_batch_sizes: list[int] = []
+        self.num_return_sequences: list[int] = []
+        self.max_lengths: list[int] = []
+        self.encoded_rows = 0
+        self.greedy_is_noise = greedy_is_noise
+        self.config = SimpleNamespace(use_cache=False)
+        self.encoder = FakeEncoder(self)
+
+    def to(self, device):
+        return self
+
+    def eval(self):
+        return self
+
+    def get_encoder(self):
+        return self.encoder
+
+    def generate(
+        self, input_ids=None, attention_mask=None, do_sample=False, encoder_outputs=None, num_return_sequences=1, **kwargs
+    ):
+        self.max_lengths.append(kwargs.get("max_length"))
+        if encoder_outputs is not None:
+            input_ids = encoder_outputs.last_hidden_state.squeeze(-1).long()
+        if do_sample:
+            self.sampled_batch_sizes.append(int(input_ids.shape[0]))
+            self.num_return_sequences.append(num_return_sequences)
+            return input_ids[:, :1].repeat_interleave(num_return_sequences, dim=0)
+        self.batch_sizes.append(int(input_ids.shape[0]))
+        if self.greedy_is_noise:
+            return torch.zeros_like(input_ids[:, :1])
+        return input_ids[:, :1]
+
+
+def _build_annotator(note_mode: str = "llm", model: FakeModel | None = None, **kwargs) -> LocalT5Annotator:
+    """Build the annotator through its real model-backed setup, with the loaders faked."""
+    with mock.patch.dict(LocalT5Annotator._TOKENIZER_CACHE, clear=True), mock.patch.dict(
+        LocalT5Annotator._MODEL_CACHE, clear=True
+    ), mock.patch("torch.cuda.is_available", return_value=True), mock.patch(
+        "torch.cuda.is_bf16_supported", return_value=False
+    ), mock.patch("torch.compile", side_effect=lambda fn, **_: fn), mock.patch.object(
+        LocalT5Annotator, "_load_tokenizer", return_value=FakeTokenizer()
+    ), mock.patch.object(
+        LocalT5Annotator, "_load_torch_model", return_value=model or FakeModel()
+    ):
+        annotator = LocalT5Annotator(model_dir=".", note_mode=note_mode, **kwargs)
+    # Setup targets CUDA; there is no GPU here, so the fake model's tensors stay on the CPU.
+    annotator.device = torch.device("cpu")
+    return annotator
+
+
+def _word(content: str, node_id: str) -> dict:
+    return {
+        "type": "Word",
+        "content": content,
+        "part_of_speech": "noun",
+        "tense": "null",
+        "node_id": node_id,
+        "linguistic_elements": [],
+    }
+
+
+def _sentence_doc() -> dict:
+    return {
+        "Cats like fish.": {
+            "type": "Sentence",
+            "content": "Cats like fish.",
+            "part_of_speech": "sentence",
+            "tense": "present",
+            "node_id": "n1",
+            "linguistic_elements": [_word("Cats", "n2"), _word("fish", "n3")],
+        }
+    }
+
+
+class LocalGeneratorBatchingTests(unittest.TestCase):
+    def test_llm_mode_generates_notes_in_batches(self):
+        annotator = _build_annotator(batch_size=2)
+        doc = _sentence_doc()
+
+        annotator.annotate(doc)
+
+        self.assertEqual(annotator.model.batch_sizes, [2, 1])
+        sentence = doc["Cats like fish."]
+        self.assertEqual(sentence["reason_codes"], ["MODEL_NOTE_ACCEPTED"])
+        for word in sentence["linguistic_elements"]:
+            self.assertEqual(word["reason_codes"], ["MODEL_NOTE_ACCEPTED"])
+            self.assertIn(f"'{word['content'].lower()}'", word["linguistic_notes"][0])
+
+    def test_prompts_are_batched_in_length_order(self):
+        annotator = _build_annotator(batch_size=2)
+        doc = _sentence_doc()
+        doc["Cats like fish."]["linguistic_elements"] = [_word("anchovies", "n2"), _word("cod", "n3")]
+
+        annotator.annotate(doc)
+
+        batched = annotator.tokenizer.prompts[:3]
+        self.assertEqual(batched, sorted(batched, key=len))
+
+    def test_next_batch_is_tokenized_on_a_helper_thread(self):
+        annotator = _build_annotator(batch_size=1)
+        tokenize = annotator._tokenize
+        threads = []
+
+        def record(prompts):
+            threads.append(threading.current_thread())
+            return tokenize(prompts)
+
+        annotator._tokenize = record
+        doc = annotator.annotate(_sentence_doc())
+
+        self.assertEqual(annotator.model.batch_sizes, [1, 1, 1])
+        self.assertTrue(all(thread is not threading.main_thread() for thread in threads))
+        self.assertEqual(doc["Cats like fish."]["reason_codes"], ["MODEL_NOTE_ACCEPTED"])
+
+    def test_greedy_outputs_are_reused_across_annotate_calls(self):
+        annotator = _build_annotator()
+        first = annotator.annotate(_sentence_doc())
+        self.assertEqual(annotator.model.batch_sizes, [3])
+
+        second = annotator.annotate(_sentence_doc())
+        self.assertEqual(annotator.model.batch_sizes, [3])
+        self.assertEqual(first, second)
+
+    def test_prefetched_outputs_are_not_decoded_again_when_the_cache_is_small(self):
+        for cache_size in (0, 1):
+            with self.subTest(generation_cache_size=cache_size):
+                annotator = _build_annotator(generation_cache_size=cache_size)
+                doc = annotator.annotate(_sentence_doc())
+
+                # One greedy decode per prompt, all from the prefetch batch.
+                self.assertEqual(annotator.model.batch_sizes, [3])
+                self.assertEqual(len(annotator.tokenizer.prompts), 3)
+                self.assertEqual(annotator._prefetched_outputs, {})
+                sentence = doc["Cats like fish."]
+                for node in [sentence, *sentence["linguistic_elements"]]:
+                    self.assertEqual(node["reason_codes"], ["MODEL_NOTE_ACCEPTED"])
+
+    def test_duplicate_prompts_in_document_run_once(self):
+        annotator = _build_annotator()
+        doc = _sentence_doc()
+        sentence = doc["Cats like fish."]
+        sentence["linguistic_elements"] = [_word("fish", "n2"), _word("fish", "n3")]
+
+        annotator.annotate(doc)
+
+        self.assertEqual(annotator.model.batch_sizes, [2])
+        first, second = sentence["linguistic_elements"]
+        self.assertEqual(first["linguistic_notes"], second["linguistic_notes"])
+
+    def test_generation_cache_is_bounded(self):
+        annotator = _build_annotator(generation_cache_size=2)
+        annotator.annotate(_sentence_doc())
+        self.assertEqual(len(annotator._greedy_cache), 2)
+
+    def test_sampled_retries_run_as_one_batch(self):
+        annotator = _build_annotator(model=FakeModel(greedy_is_noise=True))
+        doc = annotator.annotate(_sentence_doc())
+
+        self.assertEqual(annotator.model.batch_sizes, [3])
+        self.assertEqual(annotator.model.sampled_batch_sizes, [3])
+        self.assertEqual(annotator.model.num_return_sequences, [annotator.max_retries])
+        self.assertEqual(annotator._planned_samples, {})
+        sentence = doc["Cats like fish."]
+        for node in [sentence, *sentence["linguistic_elements"]]:
+            self.assertEqual(node["reason_codes"], ["MODEL_NOTE_ACCEPTED"])
+
+    def test_template_id_prompts_use_short_decoder_length(self):
+        annotator = _build_annotator(note_mode="two_stage")
+        annotator.annotate(_sentence_doc())
+        longest = max(len(template_id.split("_")) for template_id in all_template_ids())
+        self.assertEqual(set(annotator.model.max_lengths), {longest + 4})
+
+        annotator = _build_annotator(note_mode="llm")
+        annotator.annotate(_sentence_doc())
+        self.assertEqual(set(annotator.model.max_lengths), {annotator.max_target_length})
+
+    def test_retry_rounds_reuse_encoder_outputs(self):
+        annotator = _build_annotator(note_mode="two_stage")
+        annotator.annotate(_sentence_doc())
+
+        self.assertEqual(annotator.model.sampled_batch_sizes, [3])
+        self.assertEqual(annotator.model.encoded_rows, 3)
+        self.assertEqual(len(annotator.tokenizer.prompts), 3)
+
+    def test_hybrid_mode_skips_model_when_rule_templates_are_accepted(self):
+        annotator = _build_annotator(note_mode="hybrid")
+        doc = annotator.annotate(_sentence_doc())
+
+        self.assertEqual(annotator.tokenizer.prompts, [])
+        self.assertEqual(annotator.model.batch_sizes, [])
+        sentence = doc["Cats like fish."]
+        for node in [sentence, *sentence["linguistic_elements"]]:
+            self.assertEqual(node["reason_codes"], ["RULE_TEMPLATE_NOTE_ACCEPTED"])
+
+    def test_hybrid_mode_batches_template_misses(self):
+        annotator = _build_annotator(note_mode="hybrid")
+        with mock.patch.object(annotator, "_generate_template_note", return_value=("", "", {})):
+            doc = annotator.annotate(_sentence_doc())
+
+        self.assertEqual(annotator.model.batch_sizes, [3])
+        sentence = doc["Cats like fish."]
+        for node in [sentence, *sentence["linguistic_elements"]]:
+            self.assertEqual(node["reason_codes"], ["MODEL_NOTE_ACCEPTED"])
+
+    def test_single_prompt_retries_share_one_encoder_pass(self):
+        annotator = _build_annotator(model=FakeModel(greedy_is_noise=True))
+
+        note, rejected = annotator._generate_note_with_retry("Node content: Cats")
+
+        self.assertIn("'cats'", note)
+        self.assertEqual(rejected, [{"text": "ok", "reason": "MODEL_OUTPUT_LOW_QUALITY"}])
+        self.assertEqual(annotator.model.encoded_rows, 1)
+        self.assertEqual(annotator.model.sampled_batch_sizes, [1])
+
+    def test_two_stage_batches_template_id_prompts(self):
+        annotator = _build_annotator(note_mode="two_stage")
+        annotator.annotate(_sentence_doc())
+
+        prompts = set(annotator.tokenizer.prompts)
+        self.assertEqual(len(prompts), 3)
+        self.assertTrue(all(p.startswith("Predict exactly one template_id") for p in prompts))
+        # The fake model never emits a template id, so every prompt draws all its retries in one batch.
+        self.assertEqual(annotator.model.batch_sizes, [3])
+        self.assertEqual(annotator.model.sampled_batch_sizes, [3])
+        self.assertEqual(annotator.model.num_return_sequences, [2])
+
+    def test_compiled_model_inputs_are_padded_to_length_buckets(self):
+        annotator = _build_annotator(compile_model=True)
+        enc = annotator._encode(["Node content: Cats", "Node content: fish"])
+
+        self.assertEqual(tuple(enc["input_ids"].shape), (2, 64))
+        self.assertEqual(int(enc["attention_mask"].sum()), 4)
+        self.assertTrue(bool((enc["input_ids"][:, 2:] == FakeTokenizer.pad_token_id).all()))
+        self.assertEqual(
+            annotator._generation_kwargs(do_sample=False, temperature=1.0)["cache_implementation"], "static"
+        )
+
+    def test_generation_stops_at_eos_and_pads_finished_rows(self):
+        kwargs = _build_annotator()._generation_kwargs(do_sample=False, temperature=1.0)
+        self.assertEqual(kwargs["eos_token_id"], FakeTokenizer.eos_token_id)
+        self.assertEqual(kwargs["pad_token_id"], FakeTokenizer.pad_token_id)
+        self.assertTrue(kwargs["use_cache"])
+        self.assertFalse(kwargs["return_dict_in_generate"])
+        self.assertNotIn("early_stopping", kwargs)
+
+    def test_parallel_sentences_match_sequential_annotation(self):
+        def doc():
+            out = {}
+            for idx, text in enumerate(("Cats like fish.", "Dogs chase cats.", "Birds sing.")):
+                sentence = _sentence_doc()["Cats like fish."]
+                sentence["content"] = text
+                sentence["node_id"] = f"s{idx}"
+                out[text] = sentence
+            return out
+
+        sequential = _build_annotator().annotate(doc())
+        self.assertEqual(_build_annotator(num_workers=3).annotate(doc()), sequential)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import torch
+
+from ela_pipeline.annotate.local_generator import LocalT5Annotator
+from ela_pipeline.annotate.template_registry import all_template_ids
+
+
+class LocalGeneratorLoadingTests(unittest.TestCase):
+    def test_model_backed_modes_require_cuda(self):
+        with tempfile.TemporaryDirectory() as model_dir, mock.patch("torch.cuda.is_available", return_value=False):
+            for note_mode in ("llm", "hybrid", "two_stage"):
+                with self.subTest(note_mode=note_mode), self.assertRaises(RuntimeError):
+                    LocalT5Annotator(model_dir=model_dir, note_mode=note_mode)
+
+    def test_model_backed_setup_loads_compiles_and_caches_the_model(self):
+        model = mock.MagicMock()
+        loaded = model.to.return_value
+        encoder = loaded.get_encoder.return_value
+        original_forward = encoder.forward
+        with tempfile.TemporaryDirectory() as model_dir, mock.patch.dict(
+            LocalT5Annotator._TOKENIZER_CACHE, clear=True
+        ), mock.patch.dict(LocalT5Annotator._MODEL_CACHE, clear=True), mock.patch(
+            "torch.cuda.is_available", return_value=True
+        ), mock.patch(
+            "torch.cuda.is_bf16_supported", return_value=True
+        ), mock.patch(
+            "torch.compile"
+        ) as compile_fn, mock.patch.object(
+            LocalT5Annotator, "_load_tokenizer"
+        ) as load_tokenizer, mock.patch.object(
+            LocalT5Annotator, "_load_torch_model", return_value=model
+        ) as load_model:
+            annotator = LocalT5Annotator(model_dir=model_dir, note_mode="hybrid", compile_model=True)
+            model_keys = list(LocalT5Annotator._MODEL_CACHE)
+
+        self.assertEqual(annotator.device, torch.device("cuda"))
+        self.assertTrue(annotator._bf16_autocast)
+        self.assertTrue(annotator.compile_model)
+        self.assertEqual(annotator._template_ids, frozenset(all_template_ids()))
+        self.assertEqual(model_keys, [(os.path.realpath(model_dir), "torch", torch.bfloat16, True)])
+        load_tokenizer.assert_called_once_with(model_dir)
+        load_model.assert_called_once_with(model_dir, torch.bfloat16)
+        model.to.assert_called_once_with(torch.device("cuda"))
+        loaded.eval.assert_called_once_with()
+        self.assertIs(loaded.config.use_cache, True)
+        compile_fn.assert_called_once_with(original_forward, mode="reduce-overhead", fullgraph=False)
+        self.assertIs(encoder.forward, compile_fn.return_value)
+        self.assertIs(annotator.model, loaded)
+        self.assertIs(annotator.tokenizer, load_tokenizer.return_value)
+
+    def test_model_and_tokenizer_are_loaded_once_per_model_dir(self):
+        with tempfile.TemporaryDirectory() as model_dir, mock.patch.dict(
+            LocalT5Annotator._TOKENIZER_CACHE, clear=True
+        ), mock.patch.dict(LocalT5Annotator._MODEL_CACHE, clear=True), mock.patch(
+            "torch.cuda.is_available", return_value=True
+        ), mock.patch(
+            "torch.cuda.is_bf16_supported", return_value=False
+        ), mock.patch(
+            "ela_pipeline.annotate.local_generator.T5TokenizerFast.from_pretrained"
+        ) as load_tokenizer, mock.patch(
+            "ela_pipeline.annotate.local_generator.T5ForConditionalGeneration.from_pretrained"
+        ) as load_model:
+            first = LocalT5Annotator(model_dir=model_dir, note_mode="llm")
+            second = LocalT5Annotator(model_dir=model_dir, note_mode="two_stage")
+
+        self.assertEqual(load_tokenizer.call_count, 1)
+        self.assertEqual(load_model.call_count, 1)
+        self.assertIs(first.tokenizer, second.tokenizer)
+        self.assertIs(first.model, second.model)
+        self.assertEqual(load_model.call_args.kwargs["dtype"], torch.float32)
+
+    def test_onnxrt_backend_uses_ort_model_without_autocast(self):
+        with self.assertRaises(ValueError):
+            LocalT5Annotator(model_dir=".", backend="tensorrt")
+
+        ort_model = object()
+        with tempfile.TemporaryDirectory() as model_dir, mock.patch.dict(
+            LocalT5Annotator._TOKENIZER_CACHE, clear=True
+        ), mock.patch.dict(LocalT5Annotator._MODEL_CACHE, clear=True), mock.patch(
+            "torch.cuda.is_available", return_value=True
+        ), mock.patch(
+            "torch.cuda.is_bf16_supported", return_value=True
+        ), mock.patch(
+            "ela_pipeline.annotate.local_generator.T5TokenizerFast.from_pretrained"
+        ), mock.patch.object(
+            LocalT5Annotator, "_load_onnxrt_model", return_value=ort_model
+        ) as load_ort:
+            annotator = LocalT5Annotator(model_dir=model_dir, note_mode="llm", backend="onnxrt")
+
+        load_ort.assert_called_once_with(model_dir)
+        self.assertIs(annotator.model, ort_model)
+        self.assertFalse(annotator._bf16_autocast)
+
+
+if __name__ == "__main__":
+    unittest.main()
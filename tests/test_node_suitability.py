@@ -5,7 +5,7 @@ from ela_pipeline.annotate.local_generator import LocalT5Annotator
 
 class NodeSuitabilityTests(unittest.TestCase):
     def setUp(self):
-        self.annotator = LocalT5Annotator.__new__(LocalT5Annotator)
+        self.annotator = LocalT5Annotator(model_dir=".", note_mode="template_only")
 
     def test_word_note_must_anchor_content(self):
         node = {"type": "Word", "content": "artifact", "tense": "null", "part_of_speech": "noun"}
@@ -68,6 +68,19 @@ class NotesQualityTests(unittest.TestCase):
                     os.environ["ELA_HARD_NEGATIVE_PATTERNS"] = old_path
                 nq._load_external_patterns.cache_clear()
 
+    def test_analyze_note_matches_individual_checks(self):
+        for raw in (
+            "  This auxiliary verb supports  tense and aspect interpretation in the verbal group. ",
+            "Node_speech phrase functioning as subject.",
+            "The phrase sets the topic and context for what follows in the text.",
+        ):
+            analysis = nq.analyze_note(raw)
+            self.assertEqual(analysis.text, nq.sanitize_note(raw))
+            self.assertEqual(analysis.normalized, nq.sanitize_note(raw).lower())
+            self.assertEqual(analysis.is_valid, nq.is_valid_note(raw))
+        self.assertEqual(nq.analyze_note("It marks tense on the verb.").kind, "morphological")
+        self.assertEqual(nq.analyze_note("It sets the topic.").kind, "discourse")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -496,6 +496,23 @@ class PipelineTests(unittest.TestCase):
         self.assertIn("backoff_used", leaf_backoff_node.get("quality_flags", []))
         self.assertIs(leaf_backoff_node.get("backoff_in_subtree"), False)
 
+    def test_backoff_summary_handles_trees_deeper_than_recursion_limit(self):
+        leaf = {"type": "Word", "node_id": "leaf", "quality_flags": [], "template_selection": {"level": "L3_POS"}}
+        node = leaf
+        for idx in range(3000):
+            node = {"type": "Phrase", "node_id": f"p{idx}", "quality_flags": [], "linguistic_elements": [node]}
+        sentence = {"type": "Sentence", "node_id": "s", "quality_flags": [], "linguistic_elements": [node]}
+
+        node_ids, leaf_ids, reasons, _ = LocalT5Annotator._collect_backoff_summary(sentence)
+
+        self.assertEqual(node_ids, ["leaf"])
+        self.assertEqual(leaf_ids, ["leaf"])
+        self.assertEqual(reasons, ["level_backoff"])
+        self.assertEqual(leaf["quality_flags"], ["backoff_used"])
+        self.assertFalse(leaf["backoff_in_subtree"])
+        self.assertTrue(node["backoff_in_subtree"])
+        self.assertTrue(sentence["backoff_in_subtree"])
+
     def test_pipeline_without_generator(self):
         out = run_pipeline("She should have trusted her instincts before making the decision.", model_dir=None)
         self.assertIsInstance(out, dict)
@@ -1,5 +1,7 @@
 import unittest
+from unittest import mock
 
+from ela_pipeline.annotate import rejected_candidates
 from ela_pipeline.annotate.rejected_candidates import (
     RejectedCandidateFilterConfig,
     norm_key,
@@ -16,6 +18,21 @@ class RejectedCandidatesProcessingTests(unittest.TestCase):
         self.assertEqual(rejected, [])
         self.assertEqual(stats, [])
 
+    def test_repeated_candidates_are_filtered_once(self):
+        rejected_candidates._normalize_kept_candidate_cached.cache_clear()
+        text = "The model repeated this exact candidate note twice."
+        with mock.patch.object(
+            rejected_candidates,
+            "normalize_candidate_text",
+            wraps=rejected_candidates.normalize_candidate_text,
+        ) as normalize:
+            first = normalize_and_aggregate_rejected_candidates(rejected_candidates=[text], node_type="Word")
+            second = normalize_and_aggregate_rejected_candidates(rejected_candidates=[text], node_type="Word")
+        self.assertEqual(first, second)
+        self.assertEqual(first[1][0]["count"], 1)
+        # One normalization plus one norm_key pass, both on the first call only.
+        self.assertEqual(normalize.call_count, 2)
+
     def test_filters_sentence_prefix_by_default(self):
         rejected, stats = normalize_and_aggregate_rejected_candidates(
             rejected_candidates=["Sentence: She should have trusted her instincts."]
@@ -102,6 +119,24 @@ class RejectedCandidatesProcessingTests(unittest.TestCase):
         self.assertEqual(rejected, ["a$%$%$%$%$%$%$%$%$%$%$%$%$%$%$%$%$%$%$%$%$%$%$%"])
         self.assertEqual(len(stats), 1)
 
+    def test_stop_list_patterns_keep_their_backreferences(self):
+        rejected, _ = normalize_and_aggregate_rejected_candidates(
+            rejected_candidates=["Echo echo repeats itself here.", "Bravo bravo repeats itself here."],
+            config=RejectedCandidateFilterConfig(
+                stop_list=[r"\b(alpha)\s+\1\b", r"\b(bravo)\s+\1\b"],
+            ),
+        )
+        self.assertEqual(rejected, ["Echo echo repeats itself here."])
+
+    def test_stop_list_accepts_inline_flags_after_the_first_pattern(self):
+        rejected, _ = normalize_and_aggregate_rejected_candidates(
+            rejected_candidates=["This note is fine as it is.", "This note mentions FORBIDDEN words."],
+            config=RejectedCandidateFilterConfig(
+                stop_list=[r"\bplaceholder\b", r"(?i)forbidden"],
+            ),
+        )
+        self.assertEqual(rejected, ["This note is fine as it is."])
+
     def test_filters_extended_stop_words(self):
         rejected, _ = normalize_and_aggregate_rejected_candidates(
             rejected_candidates=[
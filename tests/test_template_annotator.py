@@ -0,0 +1,109 @@
+import copy
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+from ela_pipeline.annotate.local_generator import LocalT5Annotator
+from ela_pipeline.annotate.template_annotator import TemplateOnlyAnnotator
+from ela_pipeline.annotate.template_registry import select_template_candidates
+from ela_pipeline.validation.notes_quality import analyze_note
+
+
+def _word(content: str, pos: str, node_id: str, **extra) -> dict:
+    node = {
+        "type": "Word",
+        "content": content,
+        "part_of_speech": pos,
+        "tense": "null",
+        "node_id": node_id,
+        "linguistic_elements": [],
+    }
+    node.update(extra)
+    return node
+
+
+def _doc() -> dict:
+    phrase = {
+        "type": "Phrase",
+        "content": "her instincts",
+        "part_of_speech": "noun phrase",
+        "tense": "null",
+        "node_id": "n2",
+        "linguistic_elements": [
+            _word("her", "pronoun", "n3", dep_label="poss"),
+            _word("instincts", "noun", "n4"),
+        ],
+    }
+    return {
+        "She trusted her instincts.": {
+            "type": "Sentence",
+            "content": "She trusted her instincts.",
+            "part_of_speech": "sentence",
+            "tense": "past",
+            "node_id": "n1",
+            "linguistic_elements": [_word("trusted", "verb", "n5", tense="past"), phrase],
+        }
+    }
+
+
+class TemplateOnlyAnnotatorTests(unittest.TestCase):
+    def test_matches_local_annotator_in_template_only_mode(self):
+        doc = _doc()
+        expected = LocalT5Annotator(model_dir=".", note_mode="template_only", backoff_debug_summary=True).annotate(
+            copy.deepcopy(doc)
+        )
+        self.assertEqual(TemplateOnlyAnnotator(backoff_debug_summary=True).annotate(doc), expected)
+
+    def test_module_does_not_import_torch(self):
+        code = (
+            "import sys\n"
+            "import ela_pipeline.annotate.template_annotator\n"
+            "print('torch' in sys.modules, 'transformers' in sys.modules)\n"
+        )
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "False False")
+
+    def test_note_analyses_are_shared_within_one_annotate_call(self):
+        annotator = TemplateOnlyAnnotator()
+        with mock.patch(
+            "ela_pipeline.annotate.template_annotator.analyze_note",
+            wraps=analyze_note,
+        ) as analyze:
+            annotator.annotate(_doc())
+        notes_analyzed = [c.args[0] for c in analyze.call_args_list]
+
+        self.assertEqual(len(notes_analyzed), len(set(notes_analyzed)))
+        self.assertEqual(annotator._note_analyses, {})
+
+    def test_template_notes_are_shared_by_identical_nodes(self):
+        annotator = TemplateOnlyAnnotator()
+        doc = _doc()
+        sentence = doc["She trusted her instincts."]
+        sentence["linguistic_elements"] = [_word("instincts", "noun", "n2"), _word("instincts", "noun", "n3")]
+        with mock.patch(
+            "ela_pipeline.annotate.template_annotator.select_template_candidates",
+            wraps=select_template_candidates,
+        ) as select:
+            annotator.annotate(doc)
+
+        self.assertEqual(select.call_count, 2)
+        first, second = sentence["linguistic_elements"]
+        self.assertEqual(first["linguistic_notes"], second["linguistic_notes"])
+        self.assertEqual(first["template_selection"], second["template_selection"])
+        self.assertIsNot(first["template_selection"], second["template_selection"])
+        self.assertEqual(annotator._template_notes, {})
+        self.assertEqual(annotator._suitability, {})
+
+    def test_kind_from_template_id_uses_prefix(self):
+        kind = TemplateOnlyAnnotator._kind_from_template_id
+        self.assertEqual(kind("word_noun_plural"), "morphological")
+        self.assertEqual(kind("VP_PRESENT_SIMPLE"), "syntactic")
+        self.assertEqual(kind("CLAUSE_RELATIVE"), "syntactic")
+        self.assertIsNone(kind("WORD"))
+        self.assertIsNone(kind("ADJ_BASIC"))
+        self.assertIsNone(kind(""))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+
+from ela_pipeline.annotate.template_registry import (
+    render_template_note,
+    select_template,
+    select_template_candidates,
+)
+
+
+class TemplateRegistryCacheTests(unittest.TestCase):
+    def test_candidates_are_a_fresh_list_per_call(self):
+        node = {"type": "Word", "content": "her", "part_of_speech": "pronoun", "dep_label": "poss"}
+        first = select_template_candidates(node)
+        first.clear()
+        second = select_template_candidates(node)
+        self.assertTrue(second)
+        self.assertEqual(second[0], select_template(node))
+
+    def test_modal_perfect_rendering_depends_on_node_tam(self):
+        base = {"type": "Sentence", "content": "She should have called.", "part_of_speech": "sentence"}
+        modal = dict(base, mood="modal", aspect="perfect")
+        plain = render_template_note("SENTENCE_FINITE_CLAUSE", base, "sentence")
+        self.assertNotEqual(render_template_note("SENTENCE_FINITE_CLAUSE", modal, "sentence"), plain)
+        self.assertEqual(render_template_note("SENTENCE_FINITE_CLAUSE", base, "sentence"), plain)
+
+
+if __name__ == "__main__":
+    unittest.main()
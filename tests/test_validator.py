@@ -1,7 +1,13 @@
 import json
 import unittest
 
-from ela_pipeline.validation.validator import validate_contract, validate_frozen_structure
+from ela_pipeline.validation.validator import (
+    frozen_shape_signature,
+    validate_annotation_fields,
+    validate_contract,
+    validate_frozen_signature,
+    validate_frozen_structure,
+)
 
 
 class ValidatorTests(unittest.TestCase):
@@ -51,6 +57,27 @@ class ValidatorTests(unittest.TestCase):
         result = validate_frozen_structure(skeleton, enriched)
         self.assertFalse(result.ok)
 
+    def test_frozen_signature_ignores_notes_and_detects_structure_changes(self):
+        with open("docs/sample.json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+        signature = frozen_shape_signature(data)
+        key = next(iter(data))
+        child = data[key]["linguistic_elements"][0]
+
+        child["linguistic_notes"] = ["A new note."]
+        self.assertTrue(validate_frozen_signature(signature, data).ok)
+
+        child["content"] = "BROKEN"
+        data[key]["linguistic_elements"].append({"type": "Word", "content": "extra", "linguistic_elements": []})
+        result = validate_frozen_signature(signature, data)
+        self.assertFalse(result.ok)
+        paths = {err.path for err in result.errors}
+        self.assertIn(f"$.{key}.linguistic_elements", paths)
+
+        del data[key]["linguistic_elements"][-1]
+        result = validate_frozen_signature(signature, data)
+        self.assertEqual([err.path for err in result.errors], [f"$.{key}.linguistic_elements[0].content"])
+
     def test_accepts_one_word_phrase(self):
         with open("docs/sample.json", "r", encoding="utf-8") as f:
             data = json.load(f)
@@ -790,6 +817,22 @@ class ValidatorTests(unittest.TestCase):
             msg=str(result.errors),
         )
 
+    def test_annotation_fields_check_accepts_sample_and_rejects_bad_notes(self):
+        with open("docs/sample.json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertTrue(validate_annotation_fields(data).ok)
+
+        sentence_key = next(iter(data))
+        child = data[sentence_key]["linguistic_elements"][0]
+        child["linguistic_notes"] = [1]
+        child["notes"] = [{"text": "x", "kind": "unknown", "confidence": 0.5, "source": "rule"}]
+
+        result = validate_annotation_fields(data)
+        self.assertFalse(result.ok)
+        paths = {err.path for err in result.errors}
+        self.assertIn(f"$.{sentence_key}.linguistic_elements[0].linguistic_notes[0]", paths)
+        self.assertIn(f"$.{sentence_key}.linguistic_elements[0].notes[0].kind", paths)
+
 
 if __name__ == "__main__":
     unittest.main()